@@ -6,13 +6,19 @@ Plays back GIFT animation files on LED hardware.
 Requires rpi_ws281x library and must run with sudo for GPIO access.
 """
 
-import csv
+import ctypes
+import io
+import mmap
+import os
 import time
 import signal
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Optional
+
+import numpy as np
 
 try:
     from rpi_ws281x import PixelStrip, Color
@@ -21,6 +27,13 @@ except ImportError:
     HAS_LED_HARDWARE = False
     print("Warning: rpi_ws281x not available. Running in simulation mode.")
 
+# Optional pandas for faster CSV parsing (C engine)
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
 
 def resolve_gift_path(filename: str) -> Optional[Path]:
     """
@@ -84,21 +97,29 @@ class GIFTPlayer:
             led_channel: PWM channel
         """
         self.led_count = led_count
+        self.led_brightness = led_brightness
         self.strip = None
         self.simulation_mode = not HAS_LED_HARDWARE
+        self._led_buffer_addr = None  # raw ws2811 pixel buffer, if exposed
 
         # Animation data
-        self.frames: List[List[Tuple[int, int, int]]] = []
+        self.frames: Optional[np.ndarray] = None  # (frames, led_count, 3) uint8
+        self.packed_frames: Optional[np.ndarray] = None  # (frames, led_count) uint32 GRB
+        self._last_packed: Optional[np.ndarray] = None  # row currently on the strip
         self.framerate: float = 30.0
         self.loop: bool = True
 
         # Initialize LED strip
         if not self.simulation_mode:
+            # Run the strip at full brightness; the requested brightness is
+            # baked into the frame data at load time instead, so the driver
+            # doesn't rescale every pixel on every show()
             self.strip = PixelStrip(
                 led_count, led_pin, led_freq_hz, led_dma,
-                led_invert, led_brightness, led_channel
+                led_invert, 255, led_channel
             )
             self.strip.begin()
+            self._led_buffer_addr = self._resolve_led_buffer()
             print(f"✓ LED strip initialized ({led_count} LEDs)")
         else:
             print(f"✓ Simulation mode ({led_count} LEDs)")
@@ -111,11 +132,17 @@ class GIFTPlayer:
         """
         Load GIFT animation file.
 
+        Frames are parsed into a single contiguous uint8 array of shape
+        (frames, led_count, 3) so playback can index rows directly instead
+        of walking Python lists of tuples.
+
         Args:
             filepath: Path to .gift file
         """
         print(f"Loading GIFT file: {filepath}")
 
+        frame_count = None
+
         with open(filepath, 'r') as f:
             # Read metadata from header comments
             for line in f:
@@ -126,6 +153,8 @@ class GIFTPlayer:
                 # Parse metadata
                 if 'framerate:' in line:
                     self.framerate = float(line.split(':')[1].strip())
+                elif 'frame_count:' in line:
+                    frame_count = int(line.split(':')[1].strip())
                 elif 'loop:' in line:
                     self.loop = line.split(':')[1].strip().lower() == 'true'
 
@@ -140,48 +169,165 @@ class GIFTPlayer:
                     f.seek(pos)
                     break
 
-            # Read CSV data
-            reader = csv.reader(f)
-            header = next(reader)  # Skip header row
-
-            # Load frames
-            self.frames = []
-            for row in reader:
-                frame_id = int(row[0])
-                colors = []
-
-                # Parse RGB triplets
-                for i in range(1, len(row), 3):
-                    r = int(row[i])
-                    g = int(row[i + 1])
-                    b = int(row[i + 2])
-                    colors.append((r, g, b))
-
-                self.frames.append(colors)
+            # Read CSV header row to determine column count
+            header = f.readline().strip().split(',')
+            file_led_count = (len(header) - 1) // 3
+
+            if HAS_PANDAS:
+                # pandas' C engine tokenizes the whole body in compiled
+                # code; skip the frame_id column (rows are already in order)
+                df = pd.read_csv(
+                    f,
+                    header=None,
+                    usecols=range(1, 1 + file_led_count * 3),
+                    dtype=np.uint8,
+                    engine='c'
+                )
+                self.frames = df.to_numpy().reshape(-1, file_led_count, 3)
+            else:
+                if frame_count is None:
+                    # Older files without a frame_count header: one cheap pass
+                    # to count data rows so the array can still be preallocated
+                    data_start = f.tell()
+                    frame_count = sum(1 for line in f if line.strip())
+                    f.seek(data_start)
+
+                self.frames = self._parse_rows_parallel(
+                    filepath, f.tell(), file_led_count, frame_count
+                )
+
+            # Brightness is fixed for the run, so bake it into the frame
+            # data with one vectorized LUT pass up front
+            if self.led_brightness < 255:
+                lut = (np.arange(256) * self.led_brightness // 255).astype(np.uint8)
+                self.frames = lut[self.frames]
+
+            # Pre-pack frames into the GRB uint32 words the WS281x buffer
+            # expects, so playback is a pure buffer copy per frame
+            rgb = self.frames[:, :self.led_count, :].astype(np.uint32)
+            self.packed_frames = (rgb[..., 1] << 16) | (rgb[..., 0] << 8) | rgb[..., 2]
 
         print(f"✓ Loaded {len(self.frames)} frames")
         print(f"  Framerate: {self.framerate} fps")
         print(f"  Duration: {len(self.frames) / self.framerate:.2f}s")
         print(f"  Loop: {self.loop}")
 
-    def set_frame(self, frame_colors: List[Tuple[int, int, int]]):
+    def _parse_rows_parallel(self, filepath: str, data_offset: int,
+                             led_count: int, frame_count: int) -> np.ndarray:
         """
-        Display a single frame.
+        Parse the CSV body into a preallocated array in parallel partitions.
+
+        The file is mapped read-only and the data region split on newline
+        boundaries into one partition per core. np.loadtxt releases the GIL
+        while tokenizing, so partitions parse concurrently, each writing
+        into its own slice of the output array.
 
         Args:
-            frame_colors: List of (R, G, B) tuples
+            filepath: Path to .gift file
+            data_offset: Byte offset of the first data row
+            led_count: Number of LEDs per row in the file
+            frame_count: Number of data rows
+
+        Returns:
+            (frame_count, led_count, 3) uint8 array
+        """
+        frames = np.empty((frame_count, led_count, 3), dtype=np.uint8)
+        usecols = range(1, 1 + led_count * 3)
+
+        with open(filepath, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                size = mm.size()
+                workers = min(os.cpu_count() or 1, 4)
+
+                # Partition the data region on newline boundaries
+                bounds = [data_offset]
+                step = max(1, (size - data_offset) // workers)
+                for k in range(1, workers):
+                    nl = mm.find(b'\n', min(data_offset + k * step, size))
+                    end = size if nl < 0 else nl + 1
+                    if end > bounds[-1]:
+                        bounds.append(end)
+                if bounds[-1] < size:
+                    bounds.append(size)
+                spans = list(zip(bounds, bounds[1:]))
+
+                # Row offset of each partition comes from its newline count
+                row_starts = []
+                row0 = 0
+                for a, b in spans:
+                    row_starts.append(row0)
+                    rows = mm[a:b].count(b'\n')
+                    if b == size and not mm[b - 1:b] == b'\n':
+                        rows += 1
+                    row0 += rows
+
+                def parse_span(args):
+                    (a, b), start = args
+                    arr = np.loadtxt(
+                        io.BytesIO(mm[a:b]),
+                        delimiter=',',
+                        usecols=usecols,
+                        dtype=np.uint8,
+                        ndmin=2
+                    )
+                    frames[start:start + len(arr)] = arr.reshape(-1, led_count, 3)
+
+                if len(spans) > 1:
+                    with ThreadPoolExecutor(max_workers=len(spans)) as pool:
+                        list(pool.map(parse_span, zip(spans, row_starts)))
+                else:
+                    parse_span((spans[0], 0))
+            finally:
+                mm.close()
+
+        return frames
+
+    def _resolve_led_buffer(self):
+        """
+        Best-effort lookup of the raw ws2811 pixel buffer address.
+
+        When available, frames can be written with a single ctypes.memmove
+        instead of per-pixel ws2811_led_set calls.
+
+        Returns:
+            Integer address for ctypes.memmove, or None if the installed
+            rpi_ws281x build does not expose the buffer
+        """
+        try:
+            from rpi_ws281x import _rpi_ws281x as ws
+            channel = self.strip._led_data.channel
+            return int(ws.ws2811_channel_t_leds_get(channel))
+        except Exception:
+            return None
+
+    def set_frame(self, frame_index: int):
+        """
+        Display a single frame by index.
+
+        Args:
+            frame_index: Index into the loaded animation
         """
         if self.simulation_mode:
             # In simulation mode, just return
             return
 
-        for i, (r, g, b) in enumerate(frame_colors):
-            if i >= self.led_count:
-                break
-            # Note: Color() takes GRB order
-            self.strip.setPixelColor(i, Color(g, r, b))
+        # Frames were packed into GRB uint32 words at load time, so
+        # displaying one is a single slice assignment into the strip buffer
+        packed = self.packed_frames[frame_index]
+
+        # Skip the DMA refresh entirely when the frame is identical to
+        # what is already on the strip (held/static frames)
+        if self._last_packed is not None and np.array_equal(packed, self._last_packed):
+            return
 
+        if self._led_buffer_addr is not None:
+            # Copy the whole frame in one memcpy, no intermediate list
+            ctypes.memmove(self._led_buffer_addr, packed.ctypes.data, packed.nbytes)
+        else:
+            self.strip._led_data[0:len(packed)] = packed.tolist()
         self.strip.show()
+        self._last_packed = packed
 
     def play(self, speed: float = 1.0, max_loops: Optional[int] = None):
         """
@@ -191,7 +337,7 @@ class GIFTPlayer:
             speed: Speed multiplier (1.0 = normal, 2.0 = 2x speed, 0.5 = half speed)
             max_loops: Maximum number of loops (None = infinite if loop=True)
         """
-        if not self.frames:
+        if self.frames is None or len(self.frames) == 0:
             print("Error: No frames loaded")
             return
 
@@ -217,27 +363,31 @@ class GIFTPlayer:
             while True:
                 loop_count += 1
 
-                # Play all frames
-                start_time = time.time()
-                for frame_idx, frame_colors in enumerate(self.frames):
-                    frame_start = time.time()
+                # Play all frames, pacing against an absolute monotonic
+                # deadline so per-frame timing errors don't accumulate
+                start_time = time.perf_counter()
+                deadline = start_time + frame_delay
+                next_progress = start_time
 
+                for frame_idx in range(len(self.frames)):
                     # Display frame
-                    self.set_frame(frame_colors)
+                    self.set_frame(frame_idx)
+
+                    now = time.perf_counter()
 
-                    # Progress indicator (every 30 frames)
-                    if (frame_idx + 1) % 30 == 0 or frame_idx == len(self.frames) - 1:
-                        elapsed = time.time() - start_time
+                    # Progress indicator (throttled to ~1 Hz)
+                    if now >= next_progress or frame_idx == len(self.frames) - 1:
+                        next_progress = now + 1.0
                         progress = (frame_idx + 1) / len(self.frames) * 100
                         if self.loop:
                             print(f"  Loop {loop_count}: Frame {frame_idx + 1}/{len(self.frames)} ({progress:.0f}%)", end='\r')
                         else:
                             print(f"  Frame {frame_idx + 1}/{len(self.frames)} ({progress:.0f}%)", end='\r')
 
-                    # Wait for next frame
-                    elapsed = time.time() - frame_start
-                    if elapsed < frame_delay:
-                        time.sleep(frame_delay - elapsed)
+                    # Sleep to the absolute deadline for the next frame
+                    if deadline > now:
+                        time.sleep(deadline - now)
+                    deadline += frame_delay
 
                 print()  # New line after progress indicator
 
@@ -351,5 +501,4 @@ Note: Requires sudo for GPIO access on Raspberry Pi
 
 
 if __name__ == '__main__':
-    import os
     sys.exit(main())
@@ -12,8 +12,17 @@ import sys
 from flask import Flask, request, jsonify
 from rpi_ws281x import PixelStrip, Color
 import threading
+import queue
 import time
 
+# Optional production WSGI server (lower per-request overhead than the
+# Flask/Werkzeug dev server)
+try:
+    from waitress import serve as waitress_serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
+
 # LED strip configuration
 LED_COUNT = 350          # Number of LED pixels
 LED_PIN = 18             # GPIO pin connected to the pixels
@@ -28,6 +37,26 @@ strip = None
 current_led = None
 auto_off_timer = None
 
+# Serialize strip writes: the WS281x DMA setup is timing-sensitive and the
+# server handles requests on multiple threads
+strip_lock = threading.Lock()
+
+# Single-LED commands are applied by a dedicated worker thread so HTTP
+# handlers never block on the DMA refresh; bursts drain into one show()
+led_queue = queue.SimpleQueue()
+
+# Cached brightness scaling tables (brightness level -> 256-entry LUT)
+_brightness_luts = {}
+
+
+def brightness_lut(brightness):
+    """Return a 256-entry channel scaling table for a brightness level."""
+    lut = _brightness_luts.get(brightness)
+    if lut is None:
+        lut = [i * brightness // 255 for i in range(256)]
+        _brightness_luts[brightness] = lut
+    return lut
+
 # Flask app
 app = Flask(__name__)
 
@@ -46,12 +75,43 @@ def all_off():
     """Turn off all LEDs."""
     global current_led
     if strip:
-        for i in range(strip.numPixels()):
-            strip.setPixelColor(i, Color(0, 0, 0))
-        strip.show()
+        with strip_lock:
+            for i in range(strip.numPixels()):
+                strip.setPixelColor(i, Color(0, 0, 0))
+            strip.show()
         current_led = None
 
 
+def led_worker():
+    """Apply queued single-LED commands, coalescing bursts into one show()."""
+    global current_led
+
+    while True:
+        commands = [led_queue.get()]
+        # Drain whatever else is already queued so a burst of requests
+        # costs a single DMA refresh
+        while True:
+            try:
+                commands.append(led_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        with strip_lock:
+            for action, led_index, r, g, b in commands:
+                if action == 'on':
+                    # Turn off previous LED
+                    if current_led is not None and current_led != led_index:
+                        strip.setPixelColor(current_led, Color(0, 0, 0))
+                    # Note: Color uses GRB order
+                    strip.setPixelColor(led_index, Color(g, r, b))
+                    current_led = led_index
+                else:  # 'off'
+                    strip.setPixelColor(led_index, Color(0, 0, 0))
+                    if current_led == led_index:
+                        current_led = None
+            strip.show()
+
+
 def cleanup(signum=None, frame=None):
     """Clean up and turn off all LEDs on exit."""
     print("\nCleaning up...")
@@ -106,8 +166,6 @@ def led_on():
         "brightness": 255           # 0-255, optional, default 255
     }
     """
-    global current_led
-
     data = request.get_json()
 
     if not data or 'index' not in data:
@@ -125,26 +183,20 @@ def led_on():
         return jsonify({"error": "Color must be [R, G, B] array"}), 400
 
     r, g, b = color
+    if not all(isinstance(c, int) and 0 <= c <= 255 for c in (r, g, b)):
+        return jsonify({"error": "Color channels must be 0-255"}), 400
 
     # Get brightness (default 255)
     brightness = data.get('brightness', 255)
     if not isinstance(brightness, int) or brightness < 0 or brightness > 255:
         return jsonify({"error": "Brightness must be 0-255"}), 400
 
-    # Apply brightness to color
-    r = int(r * brightness / 255)
-    g = int(g * brightness / 255)
-    b = int(b * brightness / 255)
-
-    # Turn off previous LED
-    if current_led is not None and current_led != led_index:
-        strip.setPixelColor(current_led, Color(0, 0, 0))
-
-    # Turn on requested LED (note: Color uses GRB order)
-    strip.setPixelColor(led_index, Color(g, r, b))
-    strip.show()
+    # Apply brightness via a cached lookup table
+    lut = brightness_lut(brightness)
+    r, g, b = lut[r], lut[g], lut[b]
 
-    current_led = led_index
+    # Hand the write to the LED worker; the handler returns immediately
+    led_queue.put(('on', led_index, r, g, b))
 
     # Reset auto-off timer
     auto_off_timeout()
@@ -152,10 +204,10 @@ def led_on():
     print(f"LED {led_index} turned on: RGB({r}, {g}, {b})")
 
     return jsonify({
-        "status": "ok",
+        "status": "accepted",
         "led_index": led_index,
         "color": [r, g, b]
-    })
+    }), 202
 
 
 @app.route('/led/off', methods=['POST'])
@@ -168,8 +220,6 @@ def led_off():
         "index": 42
     }
     """
-    global current_led
-
     data = request.get_json()
 
     if not data or 'index' not in data:
@@ -181,18 +231,115 @@ def led_off():
     if not isinstance(led_index, int) or led_index < 0 or led_index >= LED_COUNT:
         return jsonify({"error": f"Invalid LED index: {led_index}"}), 400
 
-    # Turn off LED
-    strip.setPixelColor(led_index, Color(0, 0, 0))
-    strip.show()
-
-    if current_led == led_index:
-        current_led = None
+    # Hand the write to the LED worker; the handler returns immediately
+    led_queue.put(('off', led_index, 0, 0, 0))
 
     print(f"LED {led_index} turned off")
 
     return jsonify({
-        "status": "ok",
+        "status": "accepted",
         "led_index": led_index
+    }), 202
+
+
+@app.route('/led/batch', methods=['POST'])
+def led_batch():
+    """
+    Set multiple LEDs in one request with a single strip refresh.
+
+    Each show() costs a full DMA refresh of the strip, so batching N
+    updates into one request amortizes both the HTTP and DMA overhead.
+
+    Request body (object form):
+    {
+        "leds": [
+            {"index": 42, "color": [255, 255, 255], "brightness": 255},
+            ...
+        ],
+        "clear_others": true    # optional, default false
+    }
+
+    Array form (parallel columns, as produced by array-based clients):
+    {
+        "indices": [0, 1, ...],
+        "colors": [[255, 255, 255], ...],
+        "brightness": [255, ...],   # optional, default 255 each
+        "clear_others": true        # optional, default false
+    }
+    """
+    global current_led
+
+    data = request.get_json()
+
+    if data and 'indices' in data:
+        # Normalize the array form into the per-LED object form
+        indices = data.get('indices')
+        colors = data.get('colors')
+        if (not isinstance(indices, list) or not isinstance(colors, list)
+                or len(indices) != len(colors)):
+            return jsonify(
+                {"error": "'indices' and 'colors' must be equal-length arrays"}
+            ), 400
+        brightness = data.get('brightness', [255] * len(indices))
+        if not isinstance(brightness, list) or len(brightness) != len(indices):
+            return jsonify(
+                {"error": "'brightness' must match 'indices' length"}), 400
+        data = {
+            "leds": [
+                {"index": i, "color": c, "brightness": b}
+                for i, c, b in zip(indices, colors, brightness)
+            ],
+            "clear_others": data.get('clear_others', False)
+        }
+
+    if not data or 'leds' not in data or not isinstance(data['leds'], list):
+        return jsonify({"error": "Missing 'leds' array in request"}), 400
+
+    # Validate all entries before touching the strip
+    entries = []
+    for led in data['leds']:
+        led_index = led.get('index')
+        if not isinstance(led_index, int) or led_index < 0 or led_index >= LED_COUNT:
+            return jsonify({"error": f"Invalid LED index: {led_index}"}), 400
+
+        color = led.get('color', [255, 255, 255])
+        if not isinstance(color, list) or len(color) != 3:
+            return jsonify({"error": "Color must be [R, G, B] array"}), 400
+
+        brightness = led.get('brightness', 255)
+        if not isinstance(brightness, int) or brightness < 0 or brightness > 255:
+            return jsonify({"error": "Brightness must be 0-255"}), 400
+
+        r, g, b = color
+        if not all(isinstance(c, int) and 0 <= c <= 255 for c in (r, g, b)):
+            return jsonify({"error": "Color channels must be 0-255"}), 400
+
+        lut = brightness_lut(brightness)
+        entries.append((led_index, lut[r], lut[g], lut[b]))
+
+    # Write all pixels, then refresh the strip once
+    with strip_lock:
+        if data.get('clear_others', False):
+            for i in range(strip.numPixels()):
+                strip.setPixelColor(i, Color(0, 0, 0))
+
+        for led_index, r, g, b in entries:
+            # Note: Color uses GRB order
+            strip.setPixelColor(led_index, Color(g, r, b))
+
+        strip.show()
+
+    # Multiple LEDs may now be lit, so there is no single current LED
+    current_led = None
+
+    # Reset auto-off timer
+    auto_off_timeout()
+
+    print(f"Batch update: {len(entries)} LED(s) set")
+
+    return jsonify({
+        "status": "ok",
+        "count": len(entries)
     })
 
 
@@ -235,6 +382,10 @@ def main():
     print("Initializing LED strip...")
     init_strip()
 
+    # Start the LED worker thread
+    worker = threading.Thread(target=led_worker, daemon=True)
+    worker.start()
+
     # Start auto-off timer
     auto_off_timeout()
 
@@ -244,7 +395,15 @@ def main():
     print("Press Ctrl-C to exit\n")
 
     try:
-        app.run(host=args.host, port=args.port, debug=False, threaded=True)
+        if HAS_WAITRESS:
+            # Production WSGI server: lower per-request overhead than the
+            # Flask dev server. For best DMA timing, pin the process to an
+            # isolated core, e.g.: sudo taskset -c 3 python3 led_control_server.py
+            waitress_serve(app, host=args.host, port=args.port, threads=4)
+        else:
+            print("Note: waitress not installed, using Flask dev server")
+            print("  (pip3 install waitress for lower request latency)")
+            app.run(host=args.host, port=args.port, debug=False, threaded=True)
     finally:
         cleanup()
 
@@ -6,6 +6,13 @@ from rpi_ws281x import PixelStrip, Color
 import signal
 import sys
 
+# Optional Numba JIT for the per-tick frame assembly
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 # LED strip configuration:
 LED_COUNT = 350          # Number of LED pixels
 LED_PIN = 18             # GPIO pin connected to the pixels (must support PWM)
@@ -27,17 +34,49 @@ def cleanup(signum=None, frame=None):
     print("LEDs turned off. Exiting.")
     sys.exit(0)
 
+def gaussian_envelope(width, num_pixels):
+    """Precompute the Gaussian envelope as a lookup table.
+
+    The envelope is identical every frame modulo a circular shift, so it is
+    computed once here and rolled each tick instead of re-running exp().
+    """
+    inds = np.arange(num_pixels)
+    return (255 * np.exp(-np.square(inds) / width)).astype(np.uint32)
+
+if HAS_NUMBA:
+    # Fused compiled kernels: shift the envelope LUT and pack the uint32
+    # words in one loop, with no per-tick np.roll allocations
+    @njit(cache=True)
+    def white_step(out, env, ii):
+        n = env.shape[0]
+        for k in range(n):
+            v = env[(k - ii) % n]
+            out[k] = (v << 16) | (v << 8) | v
+
+    @njit(cache=True)
+    def redgreen_step(out, env, ii):
+        n = env.shape[0]
+        half = n // 2
+        for k in range(n):
+            r = env[(k - ii) % n]
+            g = env[(k - ii - half) % n]
+            out[k] = (r << 16) | (g << 8)
+
 def gaussian_white(width, num_pixels, sleep_time):
     """Moving Gaussian envelope with white light"""
     ii = 0
-    inds = np.arange(num_pixels)
-    
+    env = gaussian_envelope(width, num_pixels)
+    out = np.empty(num_pixels, dtype=np.uint32)
+
     try:
         while True:
-            values = (255 * np.exp(-np.square((inds - ii) % num_pixels) / width)).astype(np.uint8)
-            for ind in inds:
-                # Convert numpy int to Python int
-                strip.setPixelColor(int(ind), Color(int(values[ind]), int(values[ind]), int(values[ind])))
+            if HAS_NUMBA:
+                white_step(out, env, ii)
+                packed = out
+            else:
+                values = np.roll(env, ii)
+                packed = (values << 16) | (values << 8) | values
+            strip._led_data[0:num_pixels] = packed.tolist()
             strip.show()
             ii += 1
             time.sleep(sleep_time)
@@ -47,16 +86,19 @@ def gaussian_white(width, num_pixels, sleep_time):
 def gaussian_redgreen(width, num_pixels, sleep_time):
     """Moving Gaussian envelope with red and green lights 180 degrees apart"""
     ii = 0
-    inds = np.arange(num_pixels)
-    
+    env = gaussian_envelope(width, num_pixels)
+    out = np.empty(num_pixels, dtype=np.uint32)
+
     try:
         while True:
-            values_red = (255 * np.exp(-np.square((inds - ii) % num_pixels) / width)).astype(np.uint8)
-            values_green = (255 * np.exp(-np.square((inds - (ii + num_pixels // 2)) % num_pixels) / width)).astype(np.uint8)
-            
-            for ind in inds:
-                # Convert numpy int to Python int
-                strip.setPixelColor(int(ind), Color(int(values_red[ind]), int(values_green[ind]), 0))
+            if HAS_NUMBA:
+                redgreen_step(out, env, ii)
+                packed = out
+            else:
+                values_red = np.roll(env, ii)
+                values_green = np.roll(env, ii + num_pixels // 2)
+                packed = (values_red << 16) | (values_green << 8)
+            strip._led_data[0:num_pixels] = packed.tolist()
             strip.show()
             ii += 1
             time.sleep(sleep_time)
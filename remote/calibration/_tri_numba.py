@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Numba-compiled triangulation core.
+
+The per-LED math (ray construction, 3x3 normal equations, residual) is
+a small numeric kernel with no I/O inside — ideal JIT material. When
+numba is missing the decorator degrades to a no-op and the plain-Python
+function still works, just without the speedup.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        if args and callable(args[0]):
+            return args[0]
+        return wrap
+
+
+@njit(cache=True, fastmath=True)
+def triangulate_led_core(
+    pixels,
+    angles,
+    mask,
+    camera_distance,
+    width,
+    height,
+    tan_half_fov,
+    aspect
+):
+    """
+    Fused ray construction + normal-equation solve for one LED.
+
+    Mirrors SimplifiedTriangulator.pixels_to_rays followed by
+    triangulate_rays, but in one compiled pass with no intermediate
+    arrays.
+
+    Args:
+        pixels: (K, 2) float64 pixel coordinates
+        angles: (K,) float64 camera angles in degrees
+        mask: (K,) bool, True for usable (non-occluded) detections
+        camera_distance, width, height, tan_half_fov, aspect: camera
+            model scalars
+
+    Returns:
+        (position[3], rms_residual, num_views); num_views < 2 means
+        the LED could not be solved
+    """
+    n = pixels.shape[0]
+    dirs = np.empty((n, 3))
+    orgs = np.empty((n, 3))
+
+    m00 = m01 = m02 = m11 = m12 = m22 = 0.0
+    r0 = r1 = r2 = 0.0
+    k = 0
+
+    for i in range(n):
+        if not mask[i]:
+            continue
+        a = math.radians(angles[i])
+        cos_a = math.cos(a)
+        sin_a = math.sin(a)
+        ox = camera_distance * cos_a
+        oy = camera_distance * sin_a
+
+        norm_x = (pixels[i, 0] - width / 2.0) / (width / 2.0)
+        norm_y = -(pixels[i, 1] - height / 2.0) / (height / 2.0)
+        rx = norm_x * tan_half_fov
+        ry = norm_y * tan_half_fov * aspect
+        inv = 1.0 / math.sqrt(rx * rx + ry * ry + 1.0)
+        rx *= inv
+        ry *= inv
+        rz = -inv
+
+        dx = -rx * sin_a + rz * cos_a
+        dy = rx * cos_a + rz * sin_a
+        dz = ry
+
+        # M += I - d d^T (symmetric, accumulate the upper triangle)
+        m00 += 1.0 - dx * dx
+        m01 -= dx * dy
+        m02 -= dx * dz
+        m11 += 1.0 - dy * dy
+        m12 -= dy * dz
+        m22 += 1.0 - dz * dz
+
+        # rhs += o - d (d . o); camera z is always 0
+        dot = dx * ox + dy * oy
+        r0 += ox - dx * dot
+        r1 += oy - dy * dot
+        r2 += -dz * dot
+
+        orgs[k, 0] = ox
+        orgs[k, 1] = oy
+        orgs[k, 2] = 0.0
+        dirs[k, 0] = dx
+        dirs[k, 1] = dy
+        dirs[k, 2] = dz
+        k += 1
+
+    if k < 2:
+        return np.zeros(3), np.inf, k
+
+    # Explicit symmetric 3x3 solve via cofactors; numba's np.linalg.solve
+    # needs a LAPACK-backed scipy install, and a direct inverse is
+    # cheaper at this size anyway. A vanishing determinant (degenerate
+    # geometry) is signalled with an inf residual so the caller can fall
+    # back to the rank-tolerant NumPy path.
+    c00 = m11 * m22 - m12 * m12
+    c01 = m02 * m12 - m01 * m22
+    c02 = m01 * m12 - m02 * m11
+    c11 = m00 * m22 - m02 * m02
+    c12 = m01 * m02 - m00 * m12
+    c22 = m00 * m11 - m01 * m01
+    det = m00 * c00 + m01 * c01 + m02 * c02
+    if abs(det) < 1e-12:
+        return np.zeros(3), np.inf, k
+
+    inv_det = 1.0 / det
+    position = np.array([
+        (c00 * r0 + c01 * r1 + c02 * r2) * inv_det,
+        (c01 * r0 + c11 * r1 + c12 * r2) * inv_det,
+        (c02 * r0 + c12 * r1 + c22 * r2) * inv_det
+    ])
+
+    # RMS perpendicular distance from the solution to each used ray
+    total = 0.0
+    for i in range(k):
+        vx = position[0] - orgs[i, 0]
+        vy = position[1] - orgs[i, 1]
+        vz = position[2] - orgs[i, 2]
+        proj = vx * dirs[i, 0] + vy * dirs[i, 1] + vz * dirs[i, 2]
+        ex = vx - proj * dirs[i, 0]
+        ey = vy - proj * dirs[i, 1]
+        ez = vz - proj * dirs[i, 2]
+        total += ex * ex + ey * ey + ez * ez
+
+    return position, math.sqrt(total / k), k
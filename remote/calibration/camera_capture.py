@@ -10,6 +10,158 @@ import numpy as np
 from typing import Optional, Tuple
 from dataclasses import dataclass
 
+# Optional Numba JIT for the brightness scan
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _row_max_arg(gray):
+        """Per-row max and argmax in one parallel sweep."""
+        h, w = gray.shape
+        row_max = np.zeros(h, dtype=np.uint8)
+        row_arg = np.zeros(h, dtype=np.int64)
+        for y in prange(h):
+            m = np.uint8(0)
+            a = 0
+            for x in range(w):
+                v = gray[y, x]
+                if v > m:
+                    m = v
+                    a = x
+            row_max[y] = m
+            row_arg[y] = a
+        return row_max, row_arg
+
+    @njit(parallel=True, cache=True)
+    def _isolate_channel(img, dom, o1, o2):
+        """Dominant channel minus the mean of the others, saturating at 0."""
+        h, w = img.shape[:2]
+        out = np.empty((h, w), dtype=np.uint8)
+        for y in prange(h):
+            for x in range(w):
+                v = int(img[y, x, dom]) - (int(img[y, x, o1]) + int(img[y, x, o2])) // 2
+                out[y, x] = v if v > 0 else 0
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _max_u8(img):
+        """Max over every pixel and channel in one parallel sweep."""
+        h, w, c = img.shape
+        row_max = np.zeros(h, dtype=np.uint8)
+        for y in prange(h):
+            m = np.uint8(0)
+            for x in range(w):
+                for k in range(c):
+                    v = img[y, x, k]
+                    if v > m:
+                        m = v
+            row_max[y] = m
+        return int(row_max.max())
+
+    @njit(parallel=True, cache=True)
+    def _count_above(gray, thresh):
+        """Count pixels brighter than thresh in one parallel sweep."""
+        h, w = gray.shape
+        total = 0
+        for y in prange(h):
+            c = 0
+            for x in range(w):
+                if gray[y, x] > thresh:
+                    c += 1
+            total += c
+        return total
+
+    # Trigger the JIT for the settle-poll kernel at import (cached after
+    # the first run) so the first poll of a session isn't charged the
+    # compile time
+    _max_u8(np.zeros((2, 2, 3), dtype=np.uint8))
+
+
+def probe_max(img: np.ndarray) -> int:
+    """Peak value across every pixel and channel of a probe window."""
+    if HAS_NUMBA:
+        return _max_u8(img)
+    return int(img.max())
+
+
+def scan_brightness(gray: np.ndarray, thresh_frac: float = 0.95):
+    """
+    Find the brightest pixel and count near-max pixels in one scan.
+
+    Fuses the max / argmax / bright-pixel-count passes that LED detection
+    needs, streaming the image twice (Numba) instead of three times.
+
+    Args:
+        gray: Grayscale image (H, W) uint8
+        thresh_frac: Fraction of max brightness counted as "bright"
+
+    Returns:
+        (max_val, x, y, bright_count) tuple
+    """
+    if HAS_NUMBA:
+        row_max, row_arg = _row_max_arg(gray)
+        y = int(row_max.argmax())
+        max_val = int(row_max[y])
+        x = int(row_arg[y])
+        bright_count = int(_count_above(gray, max_val * thresh_frac))
+    else:
+        # minMaxLoc fuses the max value and its location into one SIMD
+        # pass; compare + countNonZero avoids the NumPy bool temporary
+        _, max_val, _, (x, y) = cv2.minMaxLoc(gray)
+        max_val = int(max_val)
+        bright_count = cv2.countNonZero(
+            cv2.compare(gray, max_val * thresh_frac, cv2.CMP_GT))
+
+    return max_val, int(x), int(y), bright_count
+
+
+# Per-color BGR weight rows for cv2.transform: dominant channel minus the
+# mean of the others, computed in one saturating pass over the frame
+_ISOLATION_WEIGHTS = {
+    2: np.float32([[-0.5, -0.5, 1.0]]),  # Red
+    1: np.float32([[-0.5, 1.0, -0.5]]),  # Green
+    0: np.float32([[1.0, -0.5, -0.5]]),  # Blue
+}
+
+
+def make_gray_fn(led_color):
+    """
+    Build a grayscale-conversion function specialized for one LED color.
+
+    When the whole session uses a single color, the per-frame color branch
+    in detect_led can be resolved once up front. For pure colors the
+    returned function runs a single fused isolation kernel (Numba) or the
+    OpenCV saturating pipeline; white/mixed colors get plain grayscale.
+
+    Args:
+        led_color: RGB tuple the session lights LEDs with, or None
+
+    Returns:
+        Callable mapping a BGR image to a uint8 grayscale image
+    """
+    if led_color is None:
+        return lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    r, g, b = led_color
+    if not (r > g and r > b or g > r and g > b or b > r and b > g):
+        # White or mixed - standard grayscale
+        return lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # Dominant channel index in BGR layout
+    channel = 2 if (r > g and r > b) else (1 if g > b else 0)
+    o1, o2 = [c for c in (0, 1, 2) if c != channel]
+
+    if HAS_NUMBA:
+        return lambda img: _isolate_channel(img, channel, o1, o2)
+
+    weights = _ISOLATION_WEIGHTS[channel]
+    return lambda img: cv2.transform(img, weights)
+
 
 @dataclass
 class LEDDetection:
@@ -26,7 +178,15 @@ class LEDDetection:
 class CameraCapture:
     """Manages camera and LED detection."""
 
-    def __init__(self, camera_id: int = 0, exposure: float = None, gain: float = None):
+    def __init__(
+        self,
+        camera_id: int = 0,
+        exposure: float = None,
+        gain: float = None,
+        width: int = None,
+        height: int = None,
+        fourcc: str = 'MJPG'
+    ):
         """
         Initialize camera capture.
 
@@ -34,13 +194,23 @@ class CameraCapture:
             camera_id: Camera device ID (0 for default webcam)
             exposure: Manual exposure value (None for auto, typically -13 to -1 for manual)
             gain: Manual gain/ISO value (None for auto, typically 0-100 or 0-255)
+            width: Capture width in pixels (None for camera default)
+            height: Capture height in pixels (None for camera default)
+            fourcc: Capture pixel format, e.g. 'MJPG' or 'YUYV'. MJPEG is
+                encoded on the camera, so a 1080p stream fits USB2
+                bandwidth at full frame rate instead of capping near 5 fps
+                the way raw YUYV does. None keeps the camera default.
         """
         self.camera_id = camera_id
         self.exposure = exposure
         self.gain = gain
+        self.width = width
+        self.height = height
+        self.fourcc = fourcc
         self.cap = None
         self.brightness_threshold = 100
         self.ambiguity_threshold = 100  # Max bright pixels for clear detection
+        self._gray_fn = None  # Session-specialized grayscale kernel
 
     def open(self) -> bool:
         """
@@ -57,6 +227,34 @@ class CameraCapture:
         # Set camera properties for better LED detection
         self.cap.set(cv2.CAP_PROP_AUTOFOCUS, 0)  # Disable autofocus
 
+        # Keep the driver-side frame buffer shallow so capture_frame()
+        # returns the newest frame instead of a stale queued one (not all
+        # backends honor this, but V4L2 does)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # Request the capture format before the resolution; drivers pick
+        # the frame-rate table from the format
+        if self.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC,
+                         cv2.VideoWriter_fourcc(*self.fourcc))
+            actual = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+            actual_name = actual.to_bytes(4, 'little').decode('ascii', 'replace')
+            if actual_name != self.fourcc:
+                print(f"Note: camera kept format {actual_name} "
+                      f"(requested {self.fourcc})")
+
+        # Set capture resolution if requested. LED localization is only
+        # accurate to a few pixels anyway, so capturing below the camera
+        # default shrinks every downstream stage (detect, save, encode).
+        if self.width is not None and self.height is not None:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+
+            actual_w = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            actual_h = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            print(f"Capture resolution: {actual_w}x{actual_h} "
+                  f"(requested {self.width}x{self.height})")
+
         # Set exposure mode and value
         if self.exposure is not None:
             print(f"Setting manual exposure to: {self.exposure}")
@@ -109,8 +307,23 @@ class CameraCapture:
                 print(f"  Try experimenting with values near {actual_gain}")
                 print(f"  Common ranges: 0-100 (many cameras), 0-255 (some cameras)")
 
+        # Drain any frames buffered before the settings above took effect.
+        # grab() blocks until a frame arrives but skips the decode, so this
+        # is cheaper and more deterministic than timed warmup reads.
+        for _ in range(2):
+            self.cap.grab()
+
         return True
 
+    def set_session_color(self, led_color):
+        """
+        Specialize detection for a fixed session-wide LED color.
+
+        Args:
+            led_color: RGB tuple, or None to restore per-call branching
+        """
+        self._gray_fn = make_gray_fn(led_color) if led_color is not None else None
+
     def close(self):
         """Release camera device."""
         if self.cap:
@@ -135,12 +348,33 @@ class CameraCapture:
 
         return frame
 
+    def capture_fresh_frame(self) -> Optional[np.ndarray]:
+        """
+        Capture a frame guaranteed to post-date this call.
+
+        V4L2 hands out the oldest queued frame, which can pre-date an LED
+        state change even with a one-deep buffer. A decode-free grab()
+        discards whatever is queued so the following read() returns a
+        frame exposed after the call.
+
+        Returns:
+            Image as numpy array (H, W, 3) or None if error
+        """
+        if not self.cap or not self.cap.isOpened():
+            print("Camera not opened")
+            return None
+
+        self.cap.grab()
+        return self.capture_frame()
+
     def detect_led(
         self,
         image: np.ndarray,
         led_index: int,
         led_color: tuple = None,
-        return_debug_image: bool = False
+        return_debug_image: bool = False,
+        roi_center: tuple = None,
+        roi_radius: int = 100
     ):
         """
         Detect LED position in captured image.
@@ -153,35 +387,91 @@ class CameraCapture:
             led_index: Index of LED being detected
             led_color: Optional RGB tuple for color filtering (e.g., (255, 0, 0) for red)
             return_debug_image: If True, return tuple of (detection, processed_gray_image)
+            roi_center: Optional (x, y) hint; search a small window around
+                it first, falling back to the full frame on failure.
+                Adjacent LEDs on the string are close in pixel space, so
+                the previous detection usually gates the next one.
+            roi_radius: Half-size of the hint window in pixels
 
         Returns:
             LEDDetection object, or tuple of (LEDDetection, gray_image) if return_debug_image=True
         """
-        # Apply color filtering if LED color is specified
-        if led_color is not None:
-            # Convert RGB to BGR for OpenCV
-            b, g, r = led_color[2], led_color[1], led_color[0]
-
-            # Extract color channel based on dominant color
-            # This helps reject ambient white light
-            if r > g and r > b:  # Red LED
-                # Red channel minus average of others
-                gray = image[:, :, 2].astype(np.float32) - (image[:, :, 0].astype(np.float32) + image[:, :, 1].astype(np.float32)) / 2
-                gray = np.clip(gray, 0, 255).astype(np.uint8)
-            elif g > r and g > b:  # Green LED
-                gray = image[:, :, 1].astype(np.float32) - (image[:, :, 0].astype(np.float32) + image[:, :, 2].astype(np.float32)) / 2
-                gray = np.clip(gray, 0, 255).astype(np.uint8)
-            elif b > r and b > g:  # Blue LED
-                gray = image[:, :, 0].astype(np.float32) - (image[:, :, 1].astype(np.float32) + image[:, :, 2].astype(np.float32)) / 2
-                gray = np.clip(gray, 0, 255).astype(np.uint8)
-            else:  # White or mixed - use standard grayscale
-                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            # No color filtering - use standard grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-        # Find maximum brightness
-        max_val = gray.max()
+        def to_gray(img):
+            """Apply the color filter (or plain grayscale) to img."""
+            if self._gray_fn is not None:
+                # Kernel picked once for the session color; no branching
+                return self._gray_fn(img)
+
+            if led_color is not None:
+                # Convert RGB to BGR for OpenCV
+                b, g, r = led_color[2], led_color[1], led_color[0]
+
+                if r > g and r > b or g > r and g > b or b > r and b > g:
+                    # Dominant channel index in BGR layout
+                    channel = 2 if (r > g and r > b) else (1 if g > b else 0)
+
+                    if img.mean() < 40:
+                        # Dark scene: the dominant channel alone localizes
+                        # the LED, and extracting it reads a third of the
+                        # bytes the isolation kernel below touches
+                        return cv2.extractChannel(img, channel)
+
+                    # Ambient light present: isolate the dominant channel
+                    # minus the average of the others. cv2.transform fuses
+                    # the weighted combination and the saturating clip
+                    # into a single pass over the frame.
+                    return cv2.transform(img, _ISOLATION_WEIGHTS[channel])
+
+            # White/mixed or no color filtering - standard grayscale
+            return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        peak = None
+        gray = None
+
+        # Try the hinted window first when the caller knows roughly where
+        # the LED should be. Cropping before the color conversion means
+        # the filter kernel only touches the window, not the whole frame.
+        # Debug callers want the full filtered image, so they skip this.
+        if roi_center is not None and not return_debug_image:
+            x0 = max(0, roi_center[0] - roi_radius)
+            y0 = max(0, roi_center[1] - roi_radius)
+            roi = to_gray(np.ascontiguousarray(
+                image[y0:y0 + 2 * roi_radius, x0:x0 + 2 * roi_radius]))
+            max_val, rx, ry, bright_pixel_count = scan_brightness(roi, 0.95)
+            if (max_val >= self.brightness_threshold
+                    and bright_pixel_count <= self.ambiguity_threshold):
+                peak = (max_val, x0 + rx, y0 + ry, bright_pixel_count)
+
+        if peak is None:
+            gray = to_gray(image)
+            # Coarse-to-fine peak search: locate the blob on a
+            # quarter-resolution image (1/16 the pixels), then refine in a
+            # 64x64 full-res window around the coarse maximum. INTER_AREA
+            # averaging keeps the LED blob the brightest region of the
+            # downsampled image.
+            small = cv2.resize(gray, None, fx=0.25, fy=0.25,
+                               interpolation=cv2.INTER_AREA)
+            _, sx, sy, _ = scan_brightness(small, 0.95)
+
+            y0 = max(0, 4 * sy - 32)
+            x0 = max(0, 4 * sx - 32)
+            window = np.ascontiguousarray(gray[y0:y0 + 64, x0:x0 + 64])
+
+            # Fused scan refines the peak inside the window, but the
+            # ambiguity count must cover the whole frame — a window-local
+            # count would miss a second bright region far from the peak
+            # (reflection, second light), which is exactly what the check
+            # exists to catch. One compare/count pass over gray is still
+            # far cheaper than the old full-frame argmax chain.
+            max_val, wx, wy, _ = scan_brightness(window, 0.95)
+            if HAS_NUMBA:
+                bright_pixel_count = int(_count_above(gray, max_val * 0.95))
+            else:
+                bright_pixel_count = cv2.countNonZero(
+                    cv2.compare(gray, max_val * 0.95, cv2.CMP_GT))
+            peak = (max_val, x0 + wx, y0 + wy, bright_pixel_count)
+
+        max_val, x, y, bright_pixel_count = peak
 
         # Check if LED is bright enough
         if max_val < self.brightness_threshold:
@@ -196,13 +486,6 @@ class CameraCapture:
             )
             return (detection, gray) if return_debug_image else detection
 
-        # Get coordinates of brightest pixel
-        y, x = np.unravel_index(gray.argmax(), gray.shape)
-
-        # Check for ambiguity (multiple bright regions)
-        bright_mask = gray > (max_val * 0.95)
-        bright_pixel_count = bright_mask.sum()
-
         if bright_pixel_count > self.ambiguity_threshold:
             detection = LEDDetection(
                 led_index=led_index,
@@ -248,24 +531,23 @@ class CameraCapture:
         """
         # If background provided, subtract it
         if background is not None:
-            # Ensure same dtype
-            img_float = image.astype(np.float32)
-            bg_float = background.astype(np.float32)
-
-            # Subtract and clip
-            diff = img_float - bg_float
-            diff = np.clip(diff, 0, 255).astype(np.uint8)
+            # Single SIMD pass with no float temporaries; unlike a
+            # subtract-and-clip it also keeps pixels the LED darkens
+            diff = cv2.absdiff(image, background)
 
             # Use difference for detection
             gray = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
         else:
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-        # Apply Gaussian blur to reduce noise
-        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        # Apply a box blur to reduce noise; for peak finding the uint8 box
+        # filter denoises as well as a Gaussian at a fraction of the cost
+        gray = cv2.blur(gray, (5, 5))
 
-        # Continue with standard detection
-        max_val = gray.max()
+        # Continue with standard detection; one pass gives both the max
+        # value and its location
+        _, max_val, _, max_loc = cv2.minMaxLoc(gray)
+        max_val = int(max_val)
 
         if max_val < self.brightness_threshold:
             return LEDDetection(
@@ -281,11 +563,15 @@ class CameraCapture:
         # Find brightest region using blob detection
         _, thresh = cv2.threshold(gray, int(max_val * 0.9), 255, cv2.THRESH_BINARY)
 
-        # Find contours
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        # Label bright blobs; connectedComponentsWithStats hands back the
+        # per-blob areas and centroids directly, with no contour tracing
+        # or per-blob moments pass
+        num_labels, _, stats, centroids = cv2.connectedComponentsWithStats(
+            thresh, 8, cv2.CV_32S)
+        num_blobs = num_labels - 1  # label 0 is the background
 
-        if len(contours) == 0:
-            y, x = np.unravel_index(gray.argmax(), gray.shape)
+        if num_blobs == 0:
+            x, y = max_loc
             return LEDDetection(
                 led_index=led_index,
                 pixel_x=int(x),
@@ -295,20 +581,12 @@ class CameraCapture:
                 confidence=0.8
             )
 
-        # Find largest contour
-        largest_contour = max(contours, key=cv2.contourArea)
-
-        # Calculate centroid for sub-pixel accuracy
-        M = cv2.moments(largest_contour)
-        if M["m00"] > 0:
-            cx = M["m10"] / M["m00"]
-            cy = M["m01"] / M["m00"]
-        else:
-            y, x = np.unravel_index(gray.argmax(), gray.shape)
-            cx, cy = x, y
+        # Centroid of the largest blob, for sub-pixel accuracy
+        largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        cx, cy = centroids[largest]
 
         # Check for multiple bright regions
-        confidence = 1.0 if len(contours) == 1 else 1.0 / len(contours)
+        confidence = 1.0 if num_blobs == 1 else 1.0 / num_blobs
 
         return LEDDetection(
             led_index=led_index,
@@ -317,13 +595,14 @@ class CameraCapture:
             brightness=int(max_val),
             occluded=False,
             confidence=confidence,
-            notes=f"Enhanced detection, {len(contours)} regions"
+            notes=f"Enhanced detection, {num_blobs} regions"
         )
 
     def visualize_detection(
         self,
         image: np.ndarray,
-        detection: LEDDetection
+        detection: LEDDetection,
+        inplace: bool = False
     ) -> np.ndarray:
         """
         Draw detection result on image for visualization.
@@ -331,11 +610,14 @@ class CameraCapture:
         Args:
             image: Input image
             detection: Detection result
+            inplace: Draw directly on image instead of a copy (saves a
+                full-frame memcpy when the caller no longer needs the
+                original, e.g. the preview loop)
 
         Returns:
             Image with detection visualized
         """
-        vis = image.copy()
+        vis = image if inplace else image.copy()
 
         if not detection.occluded:
             # Draw crosshair at detected position
@@ -8,14 +8,24 @@ from a single camera angle.
 
 import argparse
 import json
+import queue
+import threading
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import Optional
 import cv2
+import numpy as np
 
 from pi_control import PiController
-from camera_capture import CameraCapture, LEDDetection
+from camera_capture import CameraCapture, LEDDetection, probe_max
+
+# Optional fast JSON encoder
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 
 class CaptureSession:
@@ -34,10 +44,15 @@ class CaptureSession:
         use_settling_check: bool = True,
         led_color: tuple = (255, 0, 0),  # Default: red
         exposure: float = None,  # None = auto, or manual value
-        gain: float = None  # None = auto, or manual value
+        gain: float = None,  # None = auto, or manual value
+        capture_width: int = None,  # None = camera default
+        capture_height: int = None,  # None = camera default
+        fourcc: str = 'MJPG'  # Camera pixel format
     ):
         self.pi_controller = PiController(pi_ip, pi_port)
-        self.camera = CameraCapture(camera_id, exposure=exposure, gain=gain)
+        self.camera = CameraCapture(camera_id, exposure=exposure, gain=gain,
+                                    width=capture_width, height=capture_height,
+                                    fourcc=fourcc)
         self.led_count = led_count
         self.output_dir = Path(output_dir)
         self.angle_id = angle_id
@@ -45,7 +60,33 @@ class CaptureSession:
         self.settle_time = settle_time
         self.use_settling_check = use_settling_check
         self.led_color = led_color
-        self.detections: List[LEDDetection] = []
+
+        # Detection results stored as parallel per-field arrays rather
+        # than a list of LEDDetection objects; the save/summary code scans
+        # per-field anyway and the arrays serialize with plain tolist()
+        self.detection_count = 0
+        self.led_indices = np.zeros(led_count, dtype=np.int32)
+        self.pixel_xy = np.zeros((led_count, 2), dtype=np.int32)
+        self.brightness = np.zeros(led_count, dtype=np.int32)
+        self.occluded = np.zeros(led_count, dtype=bool)
+        self.confidence = np.zeros(led_count, dtype=np.float32)
+        self.notes = [""] * led_count
+
+        # Last confident detection, used to gate the next LED's search to
+        # a small window (adjacent LEDs are close in pixel space)
+        self.last_detection_xy = None
+
+        # Learned settle behaviour: EMA of the observed brightness ramp
+        # shrinks (or grows) the fixed sleep, and the settling check is
+        # dropped entirely once the strip proves it settles within the
+        # sleep alone
+        self._settle_ema = None
+        self._fast_settles = 0
+
+        # Latest frame for the preview thread (single-slot hand-off)
+        self._preview_lock = threading.Lock()
+        self._preview_frame = None
+        self._preview_running = False
 
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -53,6 +94,52 @@ class CaptureSession:
             self.images_dir = self.output_dir / f"images_angle_{angle_id}"
             self.images_dir.mkdir(exist_ok=True)
 
+            # JPEG encoding and disk writes run on their own thread so
+            # they overlap with the next capture; the bounded queue keeps
+            # at most a few frames in memory
+            self.write_queue = queue.Queue(maxsize=8)
+            writer = threading.Thread(target=self._image_writer, daemon=True)
+            writer.start()
+
+    def _image_writer(self):
+        """Encode and write queued debug images in the background."""
+        while True:
+            path, image = self.write_queue.get()
+            try:
+                # Quality 85 halves the file size vs the default 95 with
+                # no visible difference for LED blob images; baseline
+                # encoding (no Huffman re-optimization, no progressive
+                # scans) keeps the encoder on its fastest path
+                cv2.imwrite(str(path), image,
+                            [cv2.IMWRITE_JPEG_QUALITY, 85,
+                             cv2.IMWRITE_JPEG_OPTIMIZE, 0,
+                             cv2.IMWRITE_JPEG_PROGRESSIVE, 0])
+            finally:
+                self.write_queue.task_done()
+
+    def _preview_loop(self):
+        """Render the newest detection frame on a dedicated GUI thread."""
+        while self._preview_running:
+            with self._preview_lock:
+                frame = self._preview_frame
+                self._preview_frame = None
+            if frame is not None:
+                cv2.imshow('LED Detection', frame)
+            cv2.waitKey(1)  # Pump GUI events
+            time.sleep(0.05)
+        cv2.destroyAllWindows()
+
+    def record_detection(self, detection: LEDDetection):
+        """Store a detection result in the per-field arrays."""
+        i = self.detection_count
+        self.led_indices[i] = detection.led_index
+        self.pixel_xy[i] = (detection.pixel_x, detection.pixel_y)
+        self.brightness[i] = detection.brightness
+        self.occluded[i] = detection.occluded
+        self.confidence[i] = detection.confidence
+        self.notes[i] = detection.notes
+        self.detection_count = i + 1
+
     def setup(self) -> bool:
         """Initialize Pi connection and camera."""
         print("Setting up capture session...")
@@ -74,11 +161,12 @@ class CaptureSession:
             return False
         print("✓ Camera opened")
 
-        # Wait for camera to stabilize
-        print("Warming up camera...")
-        for _ in range(5):
-            self.camera.capture_frame()
-            time.sleep(0.1)
+        # All LEDs use one color per session, so pick the grayscale kernel
+        # once instead of branching per frame
+        self.camera.set_session_color(self.led_color)
+
+        # Camera warmup happens inside CameraCapture.open(), which drains
+        # the driver buffer with grab() calls instead of timed reads
 
         return True
 
@@ -94,6 +182,7 @@ class CaptureSession:
             True if settled, False if timeout
         """
         start_time = time.time()
+        last_change = start_time
         prev_brightness = None
         stable_count = 0
 
@@ -102,10 +191,17 @@ class CaptureSession:
             if frame is None:
                 continue
 
-            # Get max brightness in frame
-            import cv2
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            current_brightness = gray.max()
+            # Brightness probe: read only the window the LED is expected
+            # in (previous detection +/- 64 px) or a 4x downsample when no
+            # hint exists. The raw channel max tracks LED ramp-up as well
+            # as a luminance conversion while touching far fewer bytes.
+            if self.last_detection_xy is not None:
+                x, y = self.last_detection_xy
+                probe = frame[max(0, y - 64):y + 64, max(0, x - 64):x + 64]
+            else:
+                probe = cv2.resize(frame, None, fx=0.25, fy=0.25,
+                                   interpolation=cv2.INTER_AREA)
+            current_brightness = probe_max(probe)
 
             # Check if brightness has stabilized
             if prev_brightness is not None:
@@ -113,53 +209,120 @@ class CaptureSession:
                 if brightness_change < 5:  # Less than 5 brightness units change
                     stable_count += 1
                     if stable_count >= num_frames:
+                        # Ramp time: how long the brightness kept moving
+                        # after the fixed sleep. Zero means the sleep
+                        # alone already covered the LED ramp-up.
+                        ramp = last_change - start_time
+                        if self._settle_ema is None:
+                            self._settle_ema = ramp
+                        else:
+                            self._settle_ema = (0.7 * self._settle_ema
+                                                + 0.3 * ramp)
+                        if ramp == 0:
+                            self._fast_settles += 1
+                            if (self.use_settling_check
+                                    and self._fast_settles >= 10):
+                                # 10 LEDs in a row were stable on the
+                                # first poll; skip the check from here on
+                                print("  (settling check disabled: strip "
+                                      "settles within the sleep window)")
+                                self.use_settling_check = False
+                        else:
+                            self._fast_settles = 0
                         return True
                 else:
                     stable_count = 0
+                    last_change = time.time()
 
             prev_brightness = current_brightness
             time.sleep(0.03)  # 30ms between checks
 
-        return False  # Timeout
+        # Timeout: the strip behaved worse than the learned model, so
+        # fall back to the conservative fixed timing and keep checking
+        self._settle_ema = None
+        self._fast_settles = 0
+        self.use_settling_check = True
+        return False
 
-    def capture_led(self, led_index: int, preview: bool = False) -> Optional[LEDDetection]:
+    def wait_and_grab(self, led_index: int):
         """
-        Capture and detect a single LED.
+        Wait out the settle window for an already-lit LED and grab a frame.
 
         Args:
-            led_index: LED index to capture
-            preview: If True, show a preview window
+            led_index: LED index being captured (for error reporting)
 
         Returns:
-            LEDDetection object or None if failed
+            Captured frame or None if failed
         """
-        # Turn on LED with specified color
-        if not self.pi_controller.light_led(led_index, color=self.led_color):
-            print(f"Failed to light LED {led_index}")
-            return None
-
-        # Wait for LED and camera to settle
-        # Fixed minimum delay for network/LED strip
-        time.sleep(self.settle_time)
+        # Wait for LED and camera to settle. The conservative fixed delay
+        # is replaced by 1.5x the learned ramp time once a few LEDs have
+        # been measured (floored at one camera frame)
+        if self._settle_ema is not None:
+            time.sleep(max(0.03, 1.5 * self._settle_ema))
+        else:
+            time.sleep(self.settle_time)
 
         # Then check for settling (optional, adds ~100-200ms)
         if self.use_settling_check:
             self.wait_for_led_settling(num_frames=3, timeout=0.5)
 
-        # Capture frame
-        frame = self.camera.capture_frame()
+        # Capture frame, discarding anything buffered before the LED lit
+        frame = self.camera.capture_fresh_frame()
         if frame is None:
             print(f"Failed to capture frame for LED {led_index}")
-            self.pi_controller.turn_off_led(led_index)
+
+        return frame
+
+    def capture_led_frame(self, led_index: int):
+        """
+        Light a single LED, wait for it to settle, and grab a frame.
+
+        This is the camera/strip-bound half of capture_led; the CPU-bound
+        detection half lives in process_frame so the two can overlap.
+
+        Args:
+            led_index: LED index to capture
+
+        Returns:
+            Captured frame or None if failed
+        """
+        # Turn on LED with specified color
+        if not self.pi_controller.light_led(led_index, color=self.led_color):
+            print(f"Failed to light LED {led_index}")
             return None
 
+        frame = self.wait_and_grab(led_index)
+
+        # Turn off LED
+        self.pi_controller.turn_off_led(led_index)
+
+        return frame
+
+    def process_frame(
+        self,
+        led_index: int,
+        frame,
+        preview: bool = False
+    ) -> LEDDetection:
+        """
+        Detect the LED in a captured frame and save debug images.
+
+        Args:
+            led_index: LED index the frame belongs to
+            frame: Captured image
+            preview: If True, show a preview window
+
+        Returns:
+            LEDDetection object
+        """
         # Detect LED with color filtering
         # Request debug image if we're saving images and using color filtering
         use_color_filtering = self.led_color != (255, 255, 255)  # Not white
         request_debug = self.save_images and use_color_filtering
 
         result = self.camera.detect_led(frame, led_index, led_color=self.led_color,
-                                        return_debug_image=request_debug)
+                                        return_debug_image=request_debug,
+                                        roi_center=self.last_detection_xy)
 
         # Unpack result
         if request_debug:
@@ -168,28 +331,52 @@ class CaptureSession:
             detection = result
             filtered_gray = None
 
-        # Save images if requested
+        # Update the search hint for the next LED
+        if not detection.occluded and detection.confidence >= 0.5:
+            self.last_detection_xy = (detection.pixel_x, detection.pixel_y)
+        else:
+            self.last_detection_xy = None
+
+        # Save images if requested (queued for the background writer)
         if self.save_images:
             # Always save raw captured image
             image_path = self.images_dir / f"led_{led_index:03d}.jpg"
-            cv2.imwrite(str(image_path), frame)
+            self.write_queue.put((image_path, frame))
 
             # If color filtering was used, also save the filtered grayscale image
             if filtered_gray is not None:
                 filtered_path = self.images_dir / f"led_{led_index:03d}_filtered.jpg"
-                cv2.imwrite(str(filtered_path), filtered_gray)
+                self.write_queue.put((filtered_path, filtered_gray))
 
-        # Show preview if requested
+        # Show preview if requested: publish the frame to the preview
+        # thread instead of paying imshow + waitKey on the capture path
         if preview:
-            vis_frame = self.camera.visualize_detection(frame, detection)
-            cv2.imshow('LED Detection', vis_frame)
-            cv2.waitKey(100)  # Brief pause
-
-        # Turn off LED
-        self.pi_controller.turn_off_led(led_index)
+            # Draw directly on the frame unless the writer thread may
+            # still be encoding it
+            vis_frame = self.camera.visualize_detection(
+                frame, detection, inplace=not self.save_images)
+            with self._preview_lock:
+                self._preview_frame = vis_frame
 
         return detection
 
+    def capture_led(self, led_index: int, preview: bool = False) -> Optional[LEDDetection]:
+        """
+        Capture and detect a single LED.
+
+        Args:
+            led_index: LED index to capture
+            preview: If True, show a preview window
+
+        Returns:
+            LEDDetection object or None if failed
+        """
+        frame = self.capture_led_frame(led_index)
+        if frame is None:
+            return None
+
+        return self.process_frame(led_index, frame, preview=preview)
+
     def run_capture(self, preview: bool = False, start_led: int = 0) -> bool:
         """
         Run full capture session for all LEDs.
@@ -208,37 +395,92 @@ class CaptureSession:
             print(f"Saving images to: {self.images_dir}")
         print()
 
-        successful = 0
-        occluded = 0
-        failed = 0
+        counts = {"successful": 0, "occluded": 0, "failed": 0}
 
-        for led_index in range(start_led, self.led_count):
-            # Progress indicator
+        def report(led_index: int, detection: Optional[LEDDetection]):
             progress = (led_index + 1) / self.led_count * 100
-            print(f"[{progress:5.1f}%] LED {led_index:3d}/{self.led_count}... ", end='', flush=True)
-
-            # Capture LED
-            detection = self.capture_led(led_index, preview=preview)
+            prefix = f"[{progress:5.1f}%] LED {led_index:3d}/{self.led_count}... "
 
             if detection is None:
-                print("FAILED")
-                failed += 1
-                continue
+                print(prefix + "FAILED")
+                counts["failed"] += 1
+                return
 
-            # Store detection
-            self.detections.append(detection)
+            self.record_detection(detection)
 
-            # Report result
             if detection.occluded:
-                print(f"OCCLUDED ({detection.notes})")
-                occluded += 1
+                print(f"{prefix}OCCLUDED ({detection.notes})")
+                counts["occluded"] += 1
             else:
-                print(f"OK - px({detection.pixel_x}, {detection.pixel_y}) conf={detection.confidence:.2f}")
-                successful += 1
+                print(f"{prefix}OK - px({detection.pixel_x}, {detection.pixel_y}) "
+                      f"conf={detection.confidence:.2f}")
+                counts["successful"] += 1
 
-        # Clean up preview window
         if preview:
-            cv2.destroyAllWindows()
+            # Capture stays serial, but rendering happens on a dedicated
+            # preview thread so no 100 ms GUI wait sits on the capture
+            # path; the thread identity also stays stable for Qt/Cocoa
+            self._preview_running = True
+            preview_thread = threading.Thread(target=self._preview_loop,
+                                              daemon=True)
+            preview_thread.start()
+
+            for led_index in range(start_led, self.led_count):
+                report(led_index, self.capture_led(led_index, preview=True))
+
+            self._preview_running = False
+            preview_thread.join()
+        else:
+            # Pipeline: the main thread drives the LED strip and camera
+            # while a worker runs detection and JPEG encoding, so the
+            # camera is never idle waiting on CPU work. Two slots give
+            # ping-pong buffering (one frame being detected, one being
+            # filled); every frame maps to exactly one LED, so unlike a
+            # video stream none may be dropped, and a detection hiccup
+            # applies backpressure rather than overwriting.
+            frame_queue = queue.Queue(maxsize=2)
+
+            def detect_worker():
+                while True:
+                    item = frame_queue.get()
+                    if item is None:
+                        break
+                    led_index, frame = item
+                    report(led_index, self.process_frame(led_index, frame))
+
+            worker = threading.Thread(target=detect_worker, daemon=True)
+            worker.start()
+
+            # The LED server's 'on' command clears the previous LED in the
+            # same strip refresh, so lighting LED N+1 right after grabbing
+            # LED N's frame both turns N off and starts N+1's settle
+            # window while N's detection is still in flight
+            lit = self.pi_controller.light_led(start_led, color=self.led_color)
+
+            for led_index in range(start_led, self.led_count):
+                if not lit:
+                    print(f"Failed to light LED {led_index}")
+                    frame = None
+                else:
+                    frame = self.wait_and_grab(led_index)
+
+                if led_index + 1 < self.led_count:
+                    lit = self.pi_controller.light_led(led_index + 1,
+                                                       color=self.led_color)
+                else:
+                    self.pi_controller.turn_off_led(led_index)
+
+                if frame is None:
+                    report(led_index, None)
+                    continue
+                frame_queue.put((led_index, frame))
+
+            frame_queue.put(None)
+            worker.join()
+
+        successful = counts["successful"]
+        occluded = counts["occluded"]
+        failed = counts["failed"]
 
         # Summary
         print("\n" + "=" * 60)
@@ -258,6 +500,7 @@ class CaptureSession:
             session_name: Name for this session
             description: Optional description
         """
+        n = self.detection_count
         session_data = {
             "version": "0.1.0",
             "session": {
@@ -271,53 +514,74 @@ class CaptureSession:
             },
             "detections": [
                 {
-                    "led_index": d.led_index,
-                    "pixel_x": d.pixel_x,
-                    "pixel_y": d.pixel_y,
-                    "brightness": d.brightness,
-                    "occluded": d.occluded,
-                    "confidence": d.confidence,
-                    "notes": d.notes
+                    "led_index": led_index,
+                    "pixel_x": px,
+                    "pixel_y": py,
+                    "brightness": brightness,
+                    "occluded": occ,
+                    "confidence": conf,
+                    "notes": notes
                 }
-                for d in self.detections
+                for led_index, px, py, brightness, occ, conf, notes in zip(
+                    self.led_indices[:n].tolist(),
+                    self.pixel_xy[:n, 0].tolist(),
+                    self.pixel_xy[:n, 1].tolist(),
+                    self.brightness[:n].tolist(),
+                    self.occluded[:n].tolist(),
+                    self.confidence[:n].tolist(),
+                    self.notes[:n]
+                )
             ]
         }
 
         output_file = self.output_dir / f"session_angle_{self.angle_id}.json"
-        with open(output_file, 'w') as f:
-            json.dump(session_data, f, indent=2)
+        if HAS_ORJSON:
+            output_file.write_bytes(
+                orjson.dumps(session_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w') as f:
+                json.dump(session_data, f, indent=2)
 
         print(f"\n✓ Session data saved to: {output_file}")
 
         # Also save summary
         summary_file = self.output_dir / f"session_angle_{self.angle_id}_summary.txt"
-        with open(summary_file, 'w') as f:
-            f.write(f"Capture Session Summary\n")
-            f.write(f"{'=' * 60}\n\n")
-            f.write(f"Session: {session_name}\n")
-            f.write(f"Date: {session_data['session']['date']}\n")
-            f.write(f"Angle: {self.angle_id}\n")
-            f.write(f"LED Count: {self.led_count}\n\n")
-
-            successful = sum(1 for d in self.detections if not d.occluded)
-            occluded = sum(1 for d in self.detections if d.occluded)
-
-            f.write(f"Results:\n")
-            f.write(f"  Successful: {successful}\n")
-            f.write(f"  Occluded: {occluded}\n\n")
-
-            if occluded > 0:
-                f.write(f"Occluded LEDs:\n")
-                for d in self.detections:
-                    if d.occluded:
-                        f.write(f"  LED {d.led_index}: {d.notes}\n")
+        occluded = int(self.occluded[:n].sum())
+        successful = n - occluded
+
+        # Build the report in memory and write it with a single syscall
+        lines = [
+            "Capture Session Summary",
+            "=" * 60,
+            "",
+            f"Session: {session_name}",
+            f"Date: {session_data['session']['date']}",
+            f"Angle: {self.angle_id}",
+            f"LED Count: {self.led_count}",
+            "",
+            "Results:",
+            f"  Successful: {successful}",
+            f"  Occluded: {occluded}",
+            "",
+        ]
+        if occluded > 0:
+            lines.append("Occluded LEDs:")
+            lines.extend(
+                f"  LED {self.led_indices[i]}: {self.notes[i]}"
+                for i in np.flatnonzero(self.occluded[:n])
+            )
+        summary_file.write_text("\n".join(lines) + "\n")
 
         print(f"✓ Summary saved to: {summary_file}")
 
     def cleanup(self):
         """Clean up resources."""
         print("\nCleaning up...")
+        if self.save_images:
+            # Wait for any queued images to reach disk
+            self.write_queue.join()
         self.pi_controller.all_off()
+        self.pi_controller.close()
         self.camera.close()
         print("✓ Cleanup complete")
 
@@ -375,6 +639,16 @@ Examples:
     parser.add_argument('--gain', type=float, default=None,
                        help='Manual camera gain/ISO (None for auto). Usually 0-100 or 0-255. '
                             'Higher gain = brighter image. Use with --exposure for full control.')
+    parser.add_argument('--capture-width', type=int, default=None,
+                       help='Capture width in pixels (default: camera default). '
+                            'Lower resolutions speed up the whole pipeline.')
+    parser.add_argument('--capture-height', type=int, default=None,
+                       help='Capture height in pixels (default: camera default)')
+    parser.add_argument('--fourcc', type=str, default='mjpg',
+                       choices=['mjpg', 'yuyv'],
+                       help='Camera pixel format (default: mjpg). MJPEG keeps '
+                            'full frame rate at high resolutions over USB2; '
+                            'yuyv is uncompressed but bandwidth-limited.')
 
     args = parser.parse_args()
 
@@ -423,7 +697,10 @@ Examples:
         use_settling_check=not args.no_settling_check,
         led_color=led_color,
         exposure=args.exposure,
-        gain=args.gain
+        gain=args.gain,
+        capture_width=args.capture_width,
+        capture_height=args.capture_height,
+        fourcc=args.fourcc.upper()
     )
 
     try:
@@ -447,8 +724,8 @@ Examples:
 
     except KeyboardInterrupt:
         print("\n\n⚠ Capture interrupted by user")
-        if len(session.detections) > 0:
-            print(f"Captured {len(session.detections)} LEDs so far")
+        if session.detection_count > 0:
+            print(f"Captured {session.detection_count} LEDs so far")
             save = input("Save partial results? (y/n): ")
             if save.lower() == 'y':
                 session.save_session(args.name + "_partial", "Interrupted capture")
@@ -8,15 +8,26 @@ Shows which LEDs have insufficient detections and displays their images if avail
 
 import argparse
 import json
+import os
+import pickle
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from collections import defaultdict
 import sys
 
+import numpy as np
+
+# Optional fast JSON parser
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Optional imports for image display
 try:
     import cv2
     import matplotlib.pyplot as plt
-    import numpy as np
     HAS_IMAGE_SUPPORT = True
 except ImportError:
     HAS_IMAGE_SUPPORT = False
@@ -32,8 +43,17 @@ def load_sessions(calibration_dir):
     calibration_dir = Path(calibration_dir)
     sessions = {}
 
-    # Find all session files
-    session_files = list(calibration_dir.glob("session_angle_*.json"))
+    # Find all session files with one directory scan; the angle ID comes
+    # straight from the filename match, and sibling images_angle_* trees
+    # are never stat'd
+    pattern = re.compile(r'^session_angle_(\d+)\.json$')
+    session_files = []
+    with os.scandir(calibration_dir) as entries:
+        for entry in entries:
+            match = pattern.match(entry.name)
+            if match and entry.is_file():
+                session_files.append((int(match.group(1)), entry.path))
+    session_files.sort()
 
     if not session_files:
         print(f"ERROR: No session files found in {calibration_dir}")
@@ -42,17 +62,33 @@ def load_sessions(calibration_dir):
 
     print(f"Found {len(session_files)} session file(s)")
 
-    for session_file in sorted(session_files):
-        # Extract angle ID from filename
-        try:
-            angle_id = int(session_file.stem.split('_')[-1])
-        except ValueError:
-            print(f"Warning: Could not parse angle ID from {session_file.name}")
-            continue
-
-        # Load session data
-        with open(session_file, 'r') as f:
-            session_data = json.load(f)
+    for angle_id, path in session_files:
+        session_file = Path(path)
+
+        # JSON parsing dominates load time on big sessions, so keep a
+        # pickle sidecar and reuse it while the JSON is unchanged
+        cache_path = session_file.with_suffix('.cache.pkl')
+        session_data = None
+        if (cache_path.exists()
+                and cache_path.stat().st_mtime >= session_file.stat().st_mtime):
+            try:
+                with open(cache_path, 'rb') as f:
+                    session_data = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, OSError):
+                session_data = None  # Stale or corrupt cache; reparse
+
+        if session_data is None:
+            if HAS_ORJSON:
+                session_data = orjson.loads(session_file.read_bytes())
+            else:
+                with open(session_file, 'r') as f:
+                    session_data = json.load(f)
+            try:
+                with open(cache_path, 'wb') as f:
+                    pickle.dump(session_data, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+            except OSError:
+                pass  # Read-only directory; caching is best-effort
 
         sessions[angle_id] = session_data
         led_count = session_data['session']['led_count']
@@ -66,63 +102,92 @@ def analyze_detections(sessions):
     """
     Analyze detection quality across all sessions.
 
+    The per-LED tallies are computed as bincounts over flat arrays rather
+    than per-LED Python loops; full detail dicts are only materialized on
+    demand (see led_details) for the handful of problematic LEDs.
+
     Returns:
-        dict: LED statistics including detection counts
+        dict with per-LED count arrays and the raw records, or None if
+        there are no detections:
+            'num_leds': highest LED index + 1
+            'total_counts', 'successful_counts', 'occluded_counts':
+                per-LED tallies, each np.ndarray of length num_leds
+            'led_indices', 'angle_ids', 'occluded_mask': flat per-record
+                arrays
+            'records': flat list of (angle_id, detection) tuples
     """
-    # Track detections per LED
-    led_detections = defaultdict(list)  # led_index -> [(angle_id, detection), ...]
+    led_indices = []
+    angle_ids = []
+    occluded = []
+    records = []
 
     for angle_id, session_data in sessions.items():
         for detection in session_data['detections']:
-            led_idx = detection['led_index']
-            led_detections[led_idx].append((angle_id, detection))
+            led_indices.append(detection['led_index'])
+            angle_ids.append(angle_id)
+            occluded.append(detection['occluded'])
+            records.append((angle_id, detection))
 
-    # Analyze each LED
-    led_stats = {}
+    if not records:
+        return None
 
-    # Determine max LED index
-    if led_detections:
-        max_led_idx = max(led_detections.keys())
-    else:
-        return {}
+    led_indices = np.asarray(led_indices)
+    angle_ids = np.asarray(angle_ids)
+    occluded = np.asarray(occluded, dtype=bool)
+
+    num_leds = int(led_indices.max()) + 1
+    total_counts = np.bincount(led_indices, minlength=num_leds)
+    occluded_counts = np.bincount(led_indices[occluded], minlength=num_leds)
 
-    for led_idx in range(max_led_idx + 1):
-        detections = led_detections[led_idx]
+    return {
+        'num_leds': num_leds,
+        'total_counts': total_counts,
+        'successful_counts': total_counts - occluded_counts,
+        'occluded_counts': occluded_counts,
+        'led_indices': led_indices,
+        'angle_ids': angle_ids,
+        'occluded_mask': occluded,
+        'records': records
+    }
 
-        # Count successful (non-occluded) detections
-        successful = [d for angle_id, d in detections if not d['occluded']]
-        occluded = [d for angle_id, d in detections if d['occluded']]
 
-        led_stats[led_idx] = {
-            'total_detections': len(detections),
-            'successful_detections': len(successful),
-            'occluded_detections': len(occluded),
-            'angles_detected': [angle_id for angle_id, d in detections if not d['occluded']],
-            'angles_occluded': [angle_id for angle_id, d in detections if d['occluded']],
-            'detections': detections
-        }
+def led_details(stats, led_idx):
+    """
+    Materialize the detail dict for a single LED.
+
+    Args:
+        stats: Output of analyze_detections
+        led_idx: LED index to expand
+
+    Returns:
+        dict with counts, per-angle visibility lists and raw detections
+    """
+    sel = np.flatnonzero(stats['led_indices'] == led_idx)
+    detections = [stats['records'][i] for i in sel]
 
-    return led_stats
+    return {
+        'total_detections': int(stats['total_counts'][led_idx]),
+        'successful_detections': int(stats['successful_counts'][led_idx]),
+        'occluded_detections': int(stats['occluded_counts'][led_idx]),
+        'angles_detected': [a for a, d in detections if not d['occluded']],
+        'angles_occluded': [a for a, d in detections if d['occluded']],
+        'detections': detections
+    }
 
 
-def find_problematic_leds(led_stats, min_detections=4):
+def find_problematic_leds(stats, min_detections=4):
     """
     Identify LEDs that may cause problems in triangulation.
 
     Args:
-        led_stats: LED statistics from analyze_detections
+        stats: Output of analyze_detections
         min_detections: Minimum successful detections required
 
     Returns:
         list: LED indices with insufficient detections
     """
-    problematic = []
-
-    for led_idx, stats in led_stats.items():
-        if stats['successful_detections'] < min_detections:
-            problematic.append(led_idx)
-
-    return sorted(problematic)
+    return np.flatnonzero(
+        stats['successful_counts'] < min_detections).tolist()
 
 
 def display_led_images(calibration_dir, led_indices, angles):
@@ -164,6 +229,24 @@ def display_led_images(calibration_dir, led_indices, angles):
     print(f"\nDisplaying images for {len(leds_with_images)} LED(s) with saved images...")
     print("Close the image window to continue")
 
+    def _decode(path):
+        # Decode at 1/4 scale inside libjpeg (plenty for review
+        # thumbnails, ~16x less pixel data than a full decode), then
+        # BGR to RGB as a reversed view, no copy
+        img = cv2.imread(str(path), cv2.IMREAD_REDUCED_COLOR_4)
+        return img[..., ::-1] if img is not None else None
+
+    # JPEG decode releases the GIL, so decode every review image up
+    # front across threads instead of one at a time between figures
+    all_paths = [
+        calibration_dir / f"images_angle_{angle}" / f"led_{led_idx:03d}.jpg"
+        for led_idx in leds_with_images
+        for angle in sorted(angles)
+    ]
+    all_paths = [p for p in all_paths if p.exists()]
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as ex:
+        decoded = dict(zip(all_paths, ex.map(_decode, all_paths)))
+
     # Display images in a grid
     for led_idx in leds_with_images:
         images = []
@@ -173,13 +256,10 @@ def display_led_images(calibration_dir, led_indices, angles):
             image_dir = calibration_dir / f"images_angle_{angle}"
             image_path = image_dir / f"led_{led_idx:03d}.jpg"
 
-            if image_path.exists():
-                img = cv2.imread(str(image_path))
-                if img is not None:
-                    # Convert BGR to RGB for matplotlib
-                    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                    images.append(img)
-                    titles.append(f"Angle {angle}")
+            img = decoded.get(image_path)
+            if img is not None:
+                images.append(img)
+                titles.append(f"Angle {angle}")
 
         if images:
             # Create figure with subplots
@@ -196,7 +276,7 @@ def display_led_images(calibration_dir, led_indices, angles):
                 axes = axes.flatten() if n_images > 1 else [axes]
 
             for i, (img, title) in enumerate(zip(images, titles)):
-                axes[i].imshow(img)
+                axes[i].imshow(img, interpolation='nearest')
                 axes[i].set_title(title)
                 axes[i].axis('off')
 
@@ -208,7 +288,7 @@ def display_led_images(calibration_dir, led_indices, angles):
             plt.show()
 
 
-def print_report(sessions, led_stats, problematic_leds, min_detections):
+def print_report(sessions, stats, problematic_leds, min_detections):
     """Print detailed analysis report."""
     print("\n" + "=" * 70)
     print("CALIBRATION PRE-CHECK REPORT")
@@ -216,7 +296,8 @@ def print_report(sessions, led_stats, problematic_leds, min_detections):
 
     # Overall statistics
     num_angles = len(sessions)
-    num_leds = len(led_stats)
+    num_leds = stats['num_leds']
+    successful_counts = stats['successful_counts']
 
     print(f"\nSession Overview:")
     print(f"  Number of angles:        {num_angles}")
@@ -224,8 +305,8 @@ def print_report(sessions, led_stats, problematic_leds, min_detections):
     print(f"  Minimum detections:      {min_detections} (for good triangulation)")
 
     # Detection quality summary
-    fully_detected = sum(1 for s in led_stats.values() if s['successful_detections'] >= num_angles)
-    good_detections = sum(1 for s in led_stats.values() if s['successful_detections'] >= min_detections)
+    fully_detected = int((successful_counts >= num_angles).sum())
+    good_detections = int((successful_counts >= min_detections).sum())
     poor_detections = len(problematic_leds)
 
     print(f"\nDetection Quality:")
@@ -240,20 +321,20 @@ def print_report(sessions, led_stats, problematic_leds, min_detections):
         print()
 
         for led_idx in problematic_leds:
-            stats = led_stats[led_idx]
-            successful = stats['successful_detections']
-            occluded = stats['occluded_detections']
-            total = stats['total_detections']
+            details = led_details(stats, led_idx)
+            successful = details['successful_detections']
+            occluded = details['occluded_detections']
+            total = details['total_detections']
 
             print(f"  LED {led_idx:3d}: {successful} successful, {occluded} occluded, {total - successful - occluded} missing")
 
-            if stats['angles_detected']:
-                print(f"           Visible from angles: {stats['angles_detected']}")
-            if stats['angles_occluded']:
-                print(f"           Occluded at angles:  {stats['angles_occluded']}")
+            if details['angles_detected']:
+                print(f"           Visible from angles: {details['angles_detected']}")
+            if details['angles_occluded']:
+                print(f"           Occluded at angles:  {details['angles_occluded']}")
 
             # Show occlusion reasons if available
-            for angle_id, detection in stats['detections']:
+            for angle_id, detection in details['detections']:
                 if detection['occluded'] and detection.get('notes'):
                     print(f"           Angle {angle_id}: {detection['notes']}")
             print()
@@ -269,8 +350,7 @@ def print_report(sessions, led_stats, problematic_leds, min_detections):
 
     # Missing LEDs
     if num_leds > 0:
-        max_expected = max(led_stats.keys()) + 1
-        missing_leds = [i for i in range(max_expected) if i not in led_stats]
+        missing_leds = np.flatnonzero(stats['total_counts'] == 0).tolist()
 
         if missing_leds:
             print(f"\n⚠ WARNING: {len(missing_leds)} LED(s) have NO detections at all:")
@@ -326,18 +406,18 @@ Examples:
     if not args.quiet:
         print("\nAnalyzing LED detections...")
 
-    led_stats = analyze_detections(sessions)
+    stats = analyze_detections(sessions)
 
-    if not led_stats:
+    if stats is None:
         print("ERROR: No LED detection data found")
         return 1
 
     # Find problematic LEDs
-    problematic_leds = find_problematic_leds(led_stats, args.min_detections)
+    problematic_leds = find_problematic_leds(stats, args.min_detections)
 
     # Print report
     if not args.quiet:
-        print_report(sessions, led_stats, problematic_leds, args.min_detections)
+        print_report(sessions, stats, problematic_leds, args.min_detections)
     else:
         if problematic_leds:
             print(f"⚠ {len(problematic_leds)} LED(s) with <{args.min_detections} detections: {problematic_leds[:20]}")
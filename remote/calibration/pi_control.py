@@ -6,48 +6,210 @@ Handles communication with Raspberry Pi to control individual LEDs
 during the calibration process.
 """
 
-import requests
-from typing import Optional, Tuple
+import functools
+import json
+import logging
+import socket
 import time
+from typing import List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Optional fast JSON encoder for hot-path request bodies
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional async HTTP client for overlapping LED commands
+try:
+    import asyncio
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+
+# For the sweep colors calibration actually uses (full white, off, and
+# the three primaries) the body is a pure function of the index, so a
+# single bytes interpolation replaces the dict build + JSON encode even
+# on a cache miss
+_BODY_TEMPLATES = {
+    (color, 255): b'{"index":%%d,"color":[%d,%d,%d],"brightness":255}' % color
+    for color in [(255, 255, 255), (0, 0, 0),
+                  (255, 0, 0), (0, 255, 0), (0, 0, 255)]
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _led_on_body(index: int, color: tuple, brightness: int) -> bytes:
+    """Pre-encoded /led/on body; calibration reuses few distinct combos."""
+    template = _BODY_TEMPLATES.get((color, brightness))
+    if template is not None:
+        return template % index
+    payload = {"index": index, "color": list(color), "brightness": brightness}
+    if HAS_ORJSON:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode()
+
+
+@functools.lru_cache(maxsize=256)
+def _led_off_body(index: int) -> bytes:
+    """Pre-encoded /led/off body."""
+    if HAS_ORJSON:
+        return orjson.dumps({"index": index})
+    return json.dumps({"index": index}).encode()
 
 
 class PiController:
     """Controls LED lighting on Raspberry Pi via HTTP API."""
 
-    def __init__(self, pi_ip: str, port: int = 8080, timeout: int = 5):
+    def __init__(self, pi_ip: str, port: int = 8080, timeout=(0.5, 2.0)):
         """
         Initialize Pi controller.
 
         Args:
             pi_ip: IP address of Raspberry Pi
             port: HTTP server port on Pi
-            timeout: Request timeout in seconds
+            timeout: (connect, read) timeouts in seconds; a bare number
+                applies to both. On a LAN the TCP connect should fail
+                fast while a read may legitimately take longer when the
+                strip worker is busy, so the two are tuned separately.
         """
         self.pi_ip = pi_ip
         self.port = port
+        # requests accepts a (connect, read) tuple directly
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
         self.timeout = timeout
         self.base_url = f"http://{pi_ip}:{port}"
+        # Endpoint URLs built once; light_led/turn_off_led run per LED
+        # and shouldn't re-format the same string every call
+        self._url_health = f"{self.base_url}/health"
+        self._url_on = f"{self.base_url}/led/on"
+        self._url_off = f"{self.base_url}/led/off"
+        self._url_batch = f"{self.base_url}/led/batch"
+        self._url_all_off = f"{self.base_url}/led/all_off"
+        self._url_status = f"{self.base_url}/status"
         self._connected = False
+        # None until the first batch call probes the endpoint
+        self._supports_batch = None
+        # (monotonic fetch time, value) pairs for the TTL caches below
+        self._status_cache = None
+        self._health_cache = None
+        # Mirror of the strip state we last commanded; re-sending an
+        # identical command costs a dict lookup instead of a round-trip
+        self._led_state = {}
+
+        # One keep-alive connection for the whole calibration run; without
+        # it every LED command pays a fresh TCP handshake over Wi-Fi.
+        # Retries absorb transient Pi hiccups (momentary 5xx or dropped
+        # connection) inside urllib3 so callers never see them; POST is
+        # included since LED commands are idempotent
+        retry = Retry(
+            total=3,
+            backoff_factor=0.05,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"])
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=2,
+            max_retries=retry
+        ))
+        # Set once on the session instead of being merged per request;
+        # Content-Type is needed because the hot paths post pre-encoded
+        # bytes via data= rather than json=
+        self.session.headers.update({
+            "Connection": "keep-alive",
+            "Content-Type": "application/json"
+        })
+
+    def close(self):
+        """Close the persistent HTTP connection."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def prewarm(self) -> bool:
+        """
+        Establish and pool the TCP connection before a timed loop.
+
+        connect() already does this implicitly (its health check runs on
+        the session, leaving the socket in the pool); prewarm() is for
+        callers that skip the health check but still want the first
+        light_led of a sweep to reuse a warm socket instead of paying
+        the handshake mid-capture.
 
-    def connect(self) -> bool:
+        Returns:
+            True if the connection was established
+        """
+        try:
+            self.session.get(self._url_health, timeout=self.timeout)
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.warning("Prewarm failed: %s", e)
+            return False
+
+    def connect(self, ttl_ms: int = 0) -> bool:
         """
         Test connection to Pi.
 
+        Args:
+            ttl_ms: Reuse a healthy result younger than this many
+                milliseconds instead of re-hitting /health (0 = always
+                check). Only success is memoized; failures always retry.
+
         Returns:
             True if Pi is reachable and responding
         """
+        if ttl_ms > 0 and self._health_cache is not None:
+            fetched_at, healthy = self._health_cache
+            if healthy and (time.monotonic() - fetched_at) < ttl_ms / 1000:
+                return True
+
+        # Cheap TCP probe first: an offline Pi fails connect in
+        # milliseconds ("connection refused" / "no route") instead of
+        # stalling the caller for the full HTTP timeout
         try:
-            response = requests.get(
-                f"{self.base_url}/health",
+            socket.create_connection(
+                (self.pi_ip, self.port), timeout=0.2).close()
+        except OSError as e:
+            logger.warning("Pi not reachable at %s:%d: %s",
+                           self.pi_ip, self.port, e)
+            self._connected = False
+            return False
+
+        try:
+            response = self.session.get(
+                self._url_health,
                 timeout=self.timeout
             )
             if response.status_code == 200:
-                data = response.json()
+                # orjson parses the small health/status payloads several
+                # times faster than the stdlib parser inside .json()
+                if HAS_ORJSON:
+                    data = orjson.loads(response.content)
+                else:
+                    data = response.json()
                 self._connected = data.get("status") == "healthy"
+                # Stamp the cache after the response so the TTL window
+                # doesn't include the request's own round-trip time
+                self._health_cache = (time.monotonic(), self._connected)
                 return self._connected
             return False
         except requests.exceptions.RequestException as e:
-            print(f"Connection error: {e}")
+            logger.warning("Connection error: %s", e)
             return False
 
     def light_led(
@@ -67,19 +229,36 @@ class PiController:
         Returns:
             True if successful
         """
+        new = (tuple(color), brightness)
+        if self._led_state.get(index) == new:
+            # Already commanded to exactly this state; skip the round-trip
+            return True
         try:
-            response = requests.post(
-                f"{self.base_url}/led/on",
-                json={
-                    "index": index,
-                    "color": list(color),
-                    "brightness": brightness
-                },
-                timeout=self.timeout
-            )
-            return response.status_code == 200
+            # Body bytes come from a cache keyed on the few distinct
+            # (index, color, brightness) combos a run uses, skipping a
+            # dict build and JSON encode per command. stream=True skips
+            # buffering the JSON ack we never read; the context manager
+            # still returns the connection to the pool.
+            with self.session.post(
+                self._url_on,
+                data=_led_on_body(index, new[0], brightness),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                # 202: server queued the command for its LED worker thread
+                ok = response.status_code in (200, 202)
+                # Discard the tiny ack without buffering it so the
+                # keep-alive connection goes back to the pool
+                response.raw.drain_conn()
+            if ok:
+                # The server keeps a single LED lit: turning this one on
+                # implicitly turns the previous one off
+                for k in self._led_state:
+                    self._led_state[k] = None
+                self._led_state[index] = new
+            return ok
         except requests.exceptions.RequestException as e:
-            print(f"Error lighting LED {index}: {e}")
+            logger.warning("Error lighting LED %d: %s", index, e)
             return False
 
     def turn_off_led(self, index: int) -> bool:
@@ -92,17 +271,206 @@ class PiController:
         Returns:
             True if successful
         """
+        if index in self._led_state and self._led_state[index] is None:
+            # Known to be off already
+            return True
         try:
-            response = requests.post(
-                f"{self.base_url}/led/off",
-                json={"index": index},
+            with self.session.post(
+                self._url_off,
+                data=_led_off_body(index),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                # 202: server queued the command for its LED worker thread
+                ok = response.status_code in (200, 202)
+                # Discard the tiny ack without buffering it so the
+                # keep-alive connection goes back to the pool
+                response.raw.drain_conn()
+            if ok:
+                self._led_state[index] = None
+            return ok
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error turning off LED %d: %s", index, e)
+            return False
+
+    def set_led_batch(self, leds: List[tuple], clear_others: bool = False) -> bool:
+        """
+        Set multiple LEDs with a single request and strip refresh.
+
+        Falls back to per-LED calls (one request each) when the Pi runs
+        an older server without the /led/batch endpoint; the 404 is
+        detected once and cached for the rest of the session.
+
+        Args:
+            leds: List of (index, color) or (index, color, brightness)
+                tuples
+            clear_others: Turn off all other LEDs in the same refresh
+
+        Returns:
+            True if successful
+        """
+        if self._supports_batch is not False:
+            entries = []
+            for led in leds:
+                entry = {"index": led[0], "color": list(led[1])}
+                if len(led) > 2:
+                    entry["brightness"] = led[2]
+                entries.append(entry)
+
+            try:
+                response = self.session.post(
+                    self._url_batch,
+                    json={"leds": entries, "clear_others": clear_others},
+                    timeout=self.timeout
+                )
+                if response.status_code == 404:
+                    print("Pi server has no /led/batch endpoint, "
+                          "falling back to per-LED requests")
+                    self._supports_batch = False
+                else:
+                    self._supports_batch = True
+                    # Batch writes bypass the single-LED model tracked
+                    # by the dedupe mirror
+                    self.invalidate_state()
+                    return response.status_code == 200
+            except requests.exceptions.RequestException as e:
+                logger.warning("Error setting LED batch: %s", e)
+                return False
+
+        # Per-LED fallback: O(N) round-trips, but works everywhere
+        ok = True
+        if clear_others:
+            ok = self.all_off()
+        for led in leds:
+            brightness = led[2] if len(led) > 2 else 255
+            ok = self.light_led(led[0], color=led[1],
+                                brightness=brightness) and ok
+        return ok
+
+    def light_leds_array(
+        self,
+        indices,
+        colors,
+        brightness=None,
+        clear_others: bool = False
+    ) -> bool:
+        """
+        Set many LEDs from NumPy arrays in one request.
+
+        For gradients or precomputed patterns, building one dict per
+        LED is pure interpreter overhead; orjson serializes the arrays
+        directly at C level (OPT_SERIALIZE_NUMPY) and the server
+        accepts the parallel-column form of /led/batch. Falls back to
+        tolist() + set_led_batch when orjson is missing.
+
+        Args:
+            indices: int array of LED indices, shape (N,)
+            colors: uint8 array of RGB colors, shape (N, 3)
+            brightness: Optional uint8 array, shape (N,); default 255
+            clear_others: Turn off all other LEDs in the same refresh
+
+        Returns:
+            True if successful
+        """
+        if not HAS_ORJSON:
+            leds = list(zip(
+                [int(i) for i in indices],
+                [tuple(int(v) for v in c) for c in colors],
+            )) if brightness is None else list(zip(
+                [int(i) for i in indices],
+                [tuple(int(v) for v in c) for c in colors],
+                [int(b) for b in brightness],
+            ))
+            return self.set_led_batch(leds, clear_others=clear_others)
+
+        payload = {"indices": indices, "colors": colors,
+                   "clear_others": clear_others}
+        if brightness is not None:
+            payload["brightness"] = brightness
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        try:
+            response = self.session.post(
+                self._url_batch,
+                data=body,
                 timeout=self.timeout
             )
+            self.invalidate_state()
             return response.status_code == 200
         except requests.exceptions.RequestException as e:
-            print(f"Error turning off LED {index}: {e}")
+            logger.warning("Error setting LED array batch: %s", e)
             return False
 
+    def pipeline_sweep(self, updates: List[dict]) -> List[bool]:
+        """
+        Send many LED commands down one socket without waiting between.
+
+        HTTP/1.1 pipelining: every request is written back-to-back and
+        the responses are read afterwards, matched to requests by order
+        alone. A deterministic sweep therefore costs roughly one
+        round-trip plus serialization time instead of one round-trip
+        per LED. requests/urllib3 can't pipeline, so this goes through
+        a raw socket. Not every server honors pipelining; the
+        calibration server processes requests on a connection in order,
+        which is exactly what this relies on.
+
+        Args:
+            updates: List of dicts with "index" and optional "color" /
+                "brightness"; a missing or None color turns the LED off
+
+        Returns:
+            Per-command success flags, in input order
+        """
+        chunks = []
+        for u in updates:
+            color = u.get("color")
+            if color is None:
+                path = b"/led/off"
+                body = _led_off_body(u["index"])
+            else:
+                path = b"/led/on"
+                body = _led_on_body(u["index"], tuple(color),
+                                    u.get("brightness", 255))
+            chunks.append(
+                b"POST " + path + b" HTTP/1.1\r\n"
+                b"Host: " + self.pi_ip.encode() + b"\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                b"Connection: keep-alive\r\n"
+                b"\r\n" + body
+            )
+
+        results = []
+        try:
+            with socket.create_connection((self.pi_ip, self.port),
+                                          timeout=self.timeout[0]) as sock:
+                sock.settimeout(self.timeout[1])
+                sock.sendall(b"".join(chunks))
+                rfile = sock.makefile("rb")
+                for _ in updates:
+                    status_line = rfile.readline()
+                    if not status_line:
+                        raise OSError("connection closed mid-pipeline")
+                    status = int(status_line.split()[1])
+                    # Consume headers and the Content-Length-framed body
+                    # so the next response starts at the right offset
+                    length = 0
+                    while True:
+                        line = rfile.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.partition(b":")
+                        if name.strip().lower() == b"content-length":
+                            length = int(value)
+                    if length:
+                        rfile.read(length)
+                    results.append(status in (200, 202))
+        except (OSError, ValueError, IndexError) as e:
+            logger.warning("Pipeline sweep error: %s", e)
+            results.extend([False] * (len(updates) - len(results)))
+        # The sweep bypassed the dedupe mirror entirely
+        self.invalidate_state()
+        return results
+
     def all_off(self) -> bool:
         """
         Turn off all LEDs.
@@ -111,40 +479,213 @@ class PiController:
             True if successful
         """
         try:
-            response = requests.post(
-                f"{self.base_url}/led/all_off",
-                timeout=self.timeout
-            )
-            return response.status_code == 200
+            with self.session.post(
+                self._url_all_off,
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raw.drain_conn()
+                if response.status_code == 200:
+                    for k in self._led_state:
+                        self._led_state[k] = None
+                    return True
+                return False
         except requests.exceptions.RequestException as e:
-            print(f"Error turning off all LEDs: {e}")
+            logger.warning("Error turning off all LEDs: %s", e)
             return False
 
-    def get_status(self) -> Optional[dict]:
+    def get_status(self, ttl_ms: int = 0) -> Optional[dict]:
         """
         Get current Pi status.
 
+        Args:
+            ttl_ms: Reuse a result younger than this many milliseconds
+                instead of re-requesting (0 = always request). Collapses
+                poll storms from UI/diagnostic loops into one real call.
+
         Returns:
             Status dictionary or None if error
         """
+        if ttl_ms > 0 and self._status_cache is not None:
+            fetched_at, status = self._status_cache
+            if (time.monotonic() - fetched_at) < ttl_ms / 1000:
+                return status
         try:
-            response = requests.get(
-                f"{self.base_url}/status",
+            response = self.session.get(
+                self._url_status,
                 timeout=self.timeout
             )
             if response.status_code == 200:
-                return response.json()
+                if HAS_ORJSON:
+                    status = orjson.loads(response.content)
+                else:
+                    status = response.json()
+                self._status_cache = (time.monotonic(), status)
+                return status
             return None
         except requests.exceptions.RequestException as e:
-            print(f"Error getting status: {e}")
+            logger.warning("Error getting status: %s", e)
             return None
 
+    def invalidate_status(self):
+        """Drop cached status/health so the next poll hits the Pi."""
+        self._status_cache = None
+        self._health_cache = None
+
+    def invalidate_state(self):
+        """
+        Forget the local LED-state mirror.
+
+        Call when the strip may have changed outside this controller
+        (Pi restart, batch/pipeline writes, another client) so the next
+        command is sent for real instead of deduplicated.
+        """
+        self._led_state.clear()
+
     @property
     def is_connected(self) -> bool:
         """Check if controller is connected."""
         return self._connected
 
 
+# Shared controller instances keyed by (ip, port); see get_controller
+_controllers = {}
+
+
+def get_controller(pi_ip: str, port: int = 8080) -> PiController:
+    """
+    Return a shared PiController for (pi_ip, port).
+
+    Constructing a fresh controller per calibration phase discards the
+    pooled keep-alive socket and re-pays TCP setup; code whose work
+    spans modules should prefer this over direct construction so the
+    connection survives phase boundaries. Pair with
+    shutdown_controllers() at program exit.
+    """
+    key = (pi_ip, port)
+    controller = _controllers.get(key)
+    if controller is None:
+        controller = _controllers[key] = PiController(pi_ip, port)
+    return controller
+
+
+def shutdown_controllers():
+    """Close every controller handed out by get_controller()."""
+    for controller in _controllers.values():
+        controller.close()
+    _controllers.clear()
+
+
+class AsyncPiController:
+    """
+    asyncio variant of PiController built on aiohttp.
+
+    LED commands are I/O-bound: each one blocks for a full network
+    round-trip while the CPU idles. Running them on an event loop lets
+    independent commands (on/off pairs, whole sweeps) overlap, so a
+    sweep costs roughly one round-trip instead of one per LED.
+
+    Requires aiohttp (`pip3 install aiohttp`); the sync PiController
+    remains the default for serial calibration capture.
+
+    HTTP/2 multiplexing (e.g. httpx with http2=True) would subsume
+    this, but the Pi server speaks HTTP/1.1 only (Flask dev server or
+    waitress), so concurrency here comes from multiple pooled
+    connections instead of streams.
+    """
+
+    def __init__(self, pi_ip: str, port: int = 8080, timeout: float = 5):
+        if not HAS_AIOHTTP:
+            raise ImportError(
+                "AsyncPiController requires aiohttp (pip3 install aiohttp)")
+        self.pi_ip = pi_ip
+        self.port = port
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.base_url = f"http://{pi_ip}:{port}"
+        self._session = None
+        self._connected = False
+
+    async def connect(self) -> bool:
+        """Open the client session and check the Pi health endpoint."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=self.timeout)
+        try:
+            async with self._session.get(f"{self.base_url}/health") as r:
+                if r.status == 200:
+                    data = await r.json()
+                    self._connected = data.get("status") == "healthy"
+                    return self._connected
+                return False
+        except aiohttp.ClientError as e:
+            logger.warning("Connection error: %s", e)
+            return False
+
+    async def close(self):
+        """Close the client session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def light_led(
+        self,
+        index: int,
+        color: Tuple[int, int, int] = (255, 255, 255),
+        brightness: int = 255
+    ) -> bool:
+        """Light up a specific LED (see PiController.light_led)."""
+        try:
+            async with self._session.post(
+                f"{self.base_url}/led/on",
+                json={
+                    "index": index,
+                    "color": list(color),
+                    "brightness": brightness
+                }
+            ) as r:
+                return r.status in (200, 202)
+        except aiohttp.ClientError as e:
+            logger.warning("Error lighting LED %d: %s", index, e)
+            return False
+
+    async def turn_off_led(self, index: int) -> bool:
+        """Turn off a specific LED (see PiController.turn_off_led)."""
+        try:
+            async with self._session.post(
+                f"{self.base_url}/led/off",
+                json={"index": index}
+            ) as r:
+                return r.status in (200, 202)
+        except aiohttp.ClientError as e:
+            logger.warning("Error turning off LED %d: %s", index, e)
+            return False
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if controller is connected."""
+        return self._connected
+
+    async def light_many(self, indices, colors) -> List[bool]:
+        """
+        Light several LEDs concurrently.
+
+        Args:
+            indices: Iterable of LED indices
+            colors: Iterable of RGB tuples, one per index
+
+        Returns:
+            Per-LED success flags, in input order
+        """
+        return await asyncio.gather(
+            *(self.light_led(i, c) for i, c in zip(indices, colors)))
+
+
 def test_connection(pi_ip: str, port: int = 8080):
     """Test Pi connection and basic LED control."""
     print(f"Testing connection to {pi_ip}:{port}...")
@@ -193,6 +734,42 @@ def test_connection(pi_ip: str, port: int = 8080):
     return True
 
 
+async def test_connection_async(pi_ip: str, port: int = 8080):
+    """
+    Async variant of test_connection.
+
+    Uses asyncio.sleep for pacing instead of time.sleep, so the pattern
+    is safe to lift into integration loops without stalling an event
+    loop the way the blocking version would.
+    """
+    print(f"Testing connection to {pi_ip}:{port}...")
+
+    async with AsyncPiController(pi_ip, port) as controller:
+        if not controller.is_connected:
+            print("❌ Failed to connect to Pi")
+            return False
+
+        print("✓ Connected to Pi")
+
+        print("\nTesting LED control (LED 0)...")
+
+        if await controller.light_led(0, color=(255, 0, 0)):
+            print("✓ LED 0 turned on (red)")
+            await asyncio.sleep(1)
+        else:
+            print("❌ Failed to turn on LED 0")
+            return False
+
+        if await controller.turn_off_led(0):
+            print("✓ LED 0 turned off")
+        else:
+            print("❌ Failed to turn off LED 0")
+            return False
+
+    print("\n✓ All tests passed!")
+    return True
+
+
 if __name__ == '__main__':
     import sys
 
@@ -204,4 +781,7 @@ if __name__ == '__main__':
     pi_ip = sys.argv[1]
     port = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
 
-    test_connection(pi_ip, port)
+    if HAS_AIOHTTP:
+        asyncio.run(test_connection_async(pi_ip, port))
+    else:
+        test_connection(pi_ip, port)
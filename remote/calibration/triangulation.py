@@ -8,10 +8,13 @@ Uses a simplified triangulation approach without full camera calibration.
 
 import json
 import argparse
+import math
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # Optional matplotlib for visualization
 try:
@@ -21,10 +24,60 @@ try:
 except ImportError:
     HAS_MATPLOTLIB = False
 
+# Optional orjson for faster JSON encoding
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Compiled per-LED triangulation kernel (plain Python when numba is
+# missing; HAS_NUMBA tells us whether it is worth dispatching to)
+from _tri_numba import HAS_NUMBA, triangulate_led_core
+
+
+def dump_json(obj, filepath):
+    """Write obj as indented JSON, using orjson's C encoder when available."""
+    if HAS_ORJSON:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(obj, f, indent=2)
+
 
-@dataclass
+def load_json(filepath):
+    """Parse a JSON file, using orjson's C decoder when available."""
+    if HAS_ORJSON:
+        return orjson.loads(Path(filepath).read_bytes())
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+
+def _load_session_file(session_file):
+    """Parse one session file; runs on a loader thread."""
+    data = load_json(session_file)
+    return data['session']['angle_id'], data
+
+
+def _normalize3(v: np.ndarray) -> np.ndarray:
+    """
+    Normalize a length-3 vector in place.
+
+    np.linalg.norm spends most of its time on generic axis/keepdims
+    dispatch for inputs this small; a plain dot + sqrt is an order of
+    magnitude cheaper on the scalar per-ray paths.
+    """
+    inv = 1.0 / math.sqrt(v[0] * v[0] + v[1] * v[1] + v[2] * v[2])
+    v[0] *= inv
+    v[1] *= inv
+    v[2] *= inv
+    return v
+
+
+@dataclass(slots=True, frozen=True)
 class Detection2D:
-    """2D detection from a single camera angle."""
+    """2D detection from a single camera angle (immutable)."""
     led_index: int
     angle_id: int
     pixel_x: float
@@ -33,16 +86,19 @@ class Detection2D:
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Position3D:
-    """3D position of an LED."""
+    """3D position of an LED.
+
+    Not frozen: export_position_map normalizes x/y/z in place.
+    """
     led_index: int
     x: float
     y: float
     z: float
     confidence: float
     num_views: int
-    detections: List[Detection2D]
+    detections: List[Detection2D] = field(default_factory=list)
 
 
 class SimplifiedTriangulator:
@@ -81,6 +137,37 @@ class SimplifiedTriangulator:
         # Calculate focal length from FOV
         self.focal_length = (image_width / 2.0) / np.tan(self.fov_horizontal / 2.0)
 
+        # Constants reused by every ray: half-FOV tangent, aspect ratio,
+        # and per-angle trig/camera-position (typically only 4 distinct
+        # angles per capture, so these amortize to almost nothing)
+        self._tan_half_fov = np.tan(self.fov_horizontal / 2.0)
+        self._aspect = image_height / image_width
+        self._angle_cache = {}
+
+    def _init_angle(self, camera_angle: float):
+        """Compute and cache (camera position, rotation matrix) for an angle."""
+        angle_rad = np.deg2rad(camera_angle)
+        cos_a = float(np.cos(angle_rad))
+        sin_a = float(np.sin(angle_rad))
+        camera_pos = np.array([
+            self.camera_distance * cos_a,
+            self.camera_distance * sin_a,
+            0.0  # All cameras at ground level (Z=0)
+        ])
+        # Camera-local -> world rotation for a camera at angle θ around
+        # the Z axis (columns are the world images of local X, Y, Z):
+        #   local +X (right) -> (-sin(θ), cos(θ), 0)
+        #   local +Y (up)    -> (0, 0, 1)
+        #   local +Z (back)  -> (cos(θ), sin(θ), 0)
+        rotation = np.array([
+            [-sin_a, 0.0, cos_a],
+            [cos_a, 0.0, sin_a],
+            [0.0, 1.0, 0.0]
+        ])
+        cached = (camera_pos, rotation)
+        self._angle_cache[camera_angle] = cached
+        return cached
+
     def pixel_to_ray(
         self,
         pixel_x: float,
@@ -99,16 +186,12 @@ class SimplifiedTriangulator:
             ray_origin: 3D point where ray starts (camera position)
             ray_direction: 3D normalized direction vector
         """
-        # Convert camera angle to radians
-        angle_rad = np.deg2rad(camera_angle)
-
-        # Camera position in X-Y plane (horizontal), looking at origin
-        # Z=0 is ground level (cameras at same height)
-        camera_pos = np.array([
-            self.camera_distance * np.cos(angle_rad),
-            self.camera_distance * np.sin(angle_rad),
-            0.0  # All cameras at ground level (Z=0)
-        ])
+        # Camera position and trig come from the per-angle cache; a
+        # session only ever uses a handful of distinct angles
+        cached = self._angle_cache.get(camera_angle)
+        if cached is None:
+            cached = self._init_angle(camera_angle)
+        camera_pos, rotation = cached
 
         # Convert pixel to normalized image coordinates (-1 to 1)
         # Center of image is (image_width/2, image_height/2)
@@ -119,80 +202,128 @@ class SimplifiedTriangulator:
         # Camera looks toward origin, with local coordinates:
         #   local +X is right, local +Y is up, local -Z is forward
         ray_camera = np.array([
-            norm_x * np.tan(self.fov_horizontal / 2.0),
-            norm_y * np.tan(self.fov_horizontal / 2.0) * (self.image_height / self.image_width),
+            norm_x * self._tan_half_fov,
+            norm_y * self._tan_half_fov * self._aspect,
             -1.0  # Camera looks in -Z direction in its local space
         ])
-        ray_camera = ray_camera / np.linalg.norm(ray_camera)
-
-        # Rotate ray to world space
-        # World: X-Y plane is horizontal, Z is up
-        # Camera rotates around Z axis by angle θ
-        cos_a = np.cos(angle_rad)
-        sin_a = np.sin(angle_rad)
-
-        # Rotation matrix to transform camera local coordinates to world coordinates
-        # Camera at angle θ around Z axis has:
-        #   local +X (right) -> world (-sin(θ), cos(θ), 0)
-        #   local +Y (up) -> world (0, 0, 1)
-        #   local -Z (forward toward origin) -> world (-cos(θ), -sin(θ), 0)
-        ray_world = np.array([
-            -ray_camera[0] * sin_a + ray_camera[2] * cos_a,
-            ray_camera[0] * cos_a + ray_camera[2] * sin_a,
-            ray_camera[1]
-        ])
-        ray_world = ray_world / np.linalg.norm(ray_world)
+        ray_camera = _normalize3(ray_camera)
+
+        # Rotate ray to world space with the cached per-angle matrix;
+        # rotation preserves the unit length so no re-normalization
+        ray_world = rotation @ ray_camera
 
         return camera_pos, ray_world
 
+    def pixels_to_rays(
+        self,
+        pixel_xy: np.ndarray,
+        angles: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert many pixel detections to rays in one vectorized pass.
+
+        Equivalent to calling pixel_to_ray per detection, but computes
+        the trig, normalization, and rotation on whole arrays instead of
+        allocating several 3-vectors per call.
+
+        Args:
+            pixel_xy: (N, 2) array of pixel coordinates
+            angles: (N,) array of camera angles in degrees
+
+        Returns:
+            origins: (N, 3) camera positions
+            directions: (N, 3) normalized world-space ray directions
+        """
+        # Work in the caller's precision: the batched solver feeds
+        # float32 arrays (half the memory traffic), everything else
+        # defaults to float64
+        pixel_xy = np.asarray(pixel_xy)
+        dtype = np.float32 if pixel_xy.dtype == np.float32 else np.float64
+        pixel_xy = pixel_xy.astype(dtype, copy=False)
+        angles_rad = np.deg2rad(np.asarray(angles, dtype=dtype))
+        cos_a = np.cos(angles_rad)
+        sin_a = np.sin(angles_rad)
+
+        half_w = self.image_width / 2.0
+        half_h = self.image_height / 2.0
+        # Plain Python floats so they don't promote float32 inputs
+        tan_half = float(np.tan(self.fov_horizontal / 2.0))
+        aspect = self.image_height / self.image_width
+
+        norm_x = (pixel_xy[:, 0] - half_w) / half_w
+        norm_y = -(pixel_xy[:, 1] - half_h) / half_h  # Flip Y
+
+        # Camera-space ray (+X right, +Y up, -Z forward), normalized
+        rx = norm_x * tan_half
+        ry = norm_y * tan_half * aspect
+        inv_len = 1.0 / np.sqrt(rx * rx + ry * ry + 1.0)
+        rx *= inv_len
+        ry *= inv_len
+        rz = -inv_len  # -1.0 scaled by the same factor
+
+        # Rotate into world space; same axis mapping as pixel_to_ray,
+        # and rotation preserves the unit length so no re-normalization
+        directions = np.stack([
+            -rx * sin_a + rz * cos_a,
+            rx * cos_a + rz * sin_a,
+            ry
+        ], axis=1)
+
+        origins = np.stack([
+            self.camera_distance * cos_a,
+            self.camera_distance * sin_a,
+            np.zeros_like(cos_a)
+        ], axis=1)
+
+        return origins, directions
+
     def triangulate_rays(
         self,
-        rays: List[Tuple[np.ndarray, np.ndarray]]
+        origins: np.ndarray,
+        directions: np.ndarray
     ) -> Tuple[np.ndarray, float]:
         """
         Find best 3D point that minimizes distance to all rays.
 
-        Uses least-squares method to find point closest to all rays.
+        The least-squares system stacks (I - d dᵀ) P = (I - d dᵀ) o per
+        ray, but its normal equations are only 3x3:
+            M = Σ (I - d dᵀ) = K·I - DᵀD
+            rhs = Σ (o - d (d·o))
+        so a direct 3x3 solve replaces the SVD-backed lstsq on a
+        (3K, 3) matrix — same minimizer, constant-size solve, no
+        per-ray Python loop.
 
         Args:
-            rays: List of (origin, direction) tuples
+            origins: (K, 3) ray origins (camera positions)
+            directions: (K, 3) unit ray directions
 
         Returns:
             position: 3D position
-            residual: Average distance from point to rays (quality metric)
+            residual: RMS distance from point to rays (quality metric)
         """
-        if len(rays) < 2:
-            return np.array([0.0, 0.0, 0.0]), float('inf')
-
-        # Solve using least squares
-        # For each ray: point = origin + t * direction
-        # Find point P that minimizes distance to all rays
-
-        A = []
-        b = []
+        origins = np.asarray(origins, dtype=np.float64)
+        directions = np.asarray(directions, dtype=np.float64)
+        num_rays = len(directions)
 
-        for origin, direction in rays:
-            # For each ray, add constraints
-            # (I - d*d^T) * P = (I - d*d^T) * origin
-            # where d is the direction unit vector
-            I = np.eye(3)
-            ddT = np.outer(direction, direction)
-            A_i = I - ddT
-            b_i = A_i @ origin
-
-            A.append(A_i)
-            b.append(b_i)
+        if num_rays < 2:
+            return np.array([0.0, 0.0, 0.0]), float('inf')
 
-        A = np.vstack(A)
-        b = np.concatenate(b)
+        M = num_rays * np.eye(3) - directions.T @ directions
+        dots = np.einsum('ij,ij->i', directions, origins)
+        rhs = (origins - directions * dots[:, None]).sum(axis=0)
 
-        # Solve least squares
         try:
-            position, residuals, rank, s = np.linalg.lstsq(A, b, rcond=None)
-            residual = np.sqrt(residuals[0] / len(rays)) if len(residuals) > 0 else 0.0
+            position = np.linalg.solve(M, rhs)
         except np.linalg.LinAlgError:
-            position = np.array([0.0, 0.0, 0.0])
-            residual = float('inf')
+            # Degenerate geometry (e.g. near-parallel rays): fall back
+            # to the rank-tolerant solver on the same 3x3 system
+            position = np.linalg.lstsq(M, rhs, rcond=None)[0]
+
+        # RMS perpendicular distance from the solution to each ray
+        to_point = position - origins
+        proj = np.einsum('ij,ij->i', directions, to_point)
+        perp = to_point - directions * proj[:, None]
+        residual = float(np.sqrt(np.einsum('ij,ij->i', perp, perp).mean()))
 
         return position, residual
 
@@ -209,24 +340,36 @@ class SimplifiedTriangulator:
         Returns:
             Position3D object or None if insufficient data
         """
-        # Filter out occluded detections
-        valid_detections = [d for d in detections if not d.occluded]
-
-        if len(valid_detections) < 2:
+        # Cheap count first: LEDs without two usable views are common
+        # (occlusion) and skipping them here avoids building any arrays
+        if sum(1 for d in detections if not d.occluded) < 2:
             return None
 
-        # Convert detections to rays
-        rays = []
-        for det in valid_detections:
-            origin, direction = self.pixel_to_ray(
-                det.pixel_x,
-                det.pixel_y,
-                det.angle_id
+        valid_detections = [d for d in detections if not d.occluded]
+
+        pixel_xy = np.array([[d.pixel_x, d.pixel_y] for d in valid_detections])
+        angles = np.array([float(d.angle_id) for d in valid_detections])
+
+        position = None
+        if HAS_NUMBA:
+            # Fused compiled kernel: ray construction, normal equations,
+            # and residual in one pass with no intermediate arrays
+            mask = np.ones(len(valid_detections), dtype=bool)
+            position, residual, _ = triangulate_led_core(
+                pixel_xy, angles, mask,
+                float(self.camera_distance),
+                float(self.image_width), float(self.image_height),
+                float(self._tan_half_fov), float(self._aspect)
             )
-            rays.append((origin, direction))
+            if not math.isfinite(residual):
+                # Degenerate geometry; the NumPy path below has a
+                # rank-tolerant lstsq fallback
+                position = None
 
-        # Triangulate
-        position, residual = self.triangulate_rays(rays)
+        if position is None:
+            # Convert all detections to rays in one vectorized call
+            origins, directions = self.pixels_to_rays(pixel_xy, angles)
+            position, residual = self.triangulate_rays(origins, directions)
 
         # Calculate confidence based on number of views and residual
         confidence = len(valid_detections) / len(detections)
@@ -275,8 +418,10 @@ class SimplifiedTriangulator:
         fig = plt.figure(figsize=(12, 10))
         ax = fig.add_subplot(111, projection='3d')
 
-        # Plot camera positions and rays
+        # Plot camera positions and rays; keep the rays around so the
+        # residual printout below doesn't recompute them per detection
         camera_positions = []
+        ray_directions = []
         ray_colors = ['red', 'blue', 'green', 'purple', 'orange', 'cyan', 'magenta', 'yellow']
 
         for i, det in enumerate(valid_detections):
@@ -288,6 +433,7 @@ class SimplifiedTriangulator:
             )
 
             camera_positions.append(origin)
+            ray_directions.append(direction)
 
             # Plot camera position
             color = ray_colors[i % len(ray_colors)]
@@ -314,17 +460,17 @@ class SimplifiedTriangulator:
         # Plot origin
         ax.scatter(0, 0, 0, c='gray', marker='x', s=100, label='Origin')
 
-        # Calculate and display residual for each ray
-        for i, det in enumerate(valid_detections):
-            origin, direction = self.pixel_to_ray(det.pixel_x, det.pixel_y, det.angle_id)
-            led_pos = np.array([position.x, position.y, position.z])
-
-            # Distance from LED to ray
-            to_led = led_pos - origin
-            projection = np.dot(to_led, direction)
-            closest_point = origin + projection * direction
-            distance = np.linalg.norm(led_pos - closest_point)
-
+        # Calculate and display residual for each ray, reusing the rays
+        # gathered while plotting (one einsum pass over all of them)
+        led_pos = np.array([position.x, position.y, position.z])
+        origins_arr = np.array(camera_positions)
+        dirs_arr = np.array(ray_directions)
+        to_led = led_pos - origins_arr
+        proj = np.einsum('ij,ij->i', dirs_arr, to_led)
+        perp = to_led - dirs_arr * proj[:, None]
+        distances = np.sqrt(np.einsum('ij,ij->i', perp, perp))
+
+        for det, distance in zip(valid_detections, distances):
             print(f"  Angle {det.angle_id:3d}°: ray distance = {distance:.4f}m")
 
         # Set labels and title
@@ -367,6 +513,22 @@ class TriangulationProcessor:
         self.sessions = {}
         self.led_count = 0
 
+        # Dense per-(LED, angle) detection arrays, built lazily by
+        # get_detection_arrays()
+        self._angle_ids = None
+        self._pixels = None
+        self._detected = None
+        self._occluded = None
+        self._det_confidence = None
+
+        # Reusable solver scratch, lazily sized on first batched solve
+        # so repeated triangulate_all calls (e.g. parameter sweeps)
+        # don't reallocate the large intermediates each time
+        self._pixels_buf = None
+        self._dots_buf = None
+        self._M_buf = None
+        self._rhs_buf = None
+
     def load_sessions(self):
         """Load all session JSON files from calibration directory."""
         session_files = sorted(self.calibration_dir.glob("session_angle_*.json"))
@@ -376,11 +538,13 @@ class TriangulationProcessor:
 
         print(f"Loading {len(session_files)} session files...")
 
-        for session_file in session_files:
-            with open(session_file, 'r') as f:
-                data = json.load(f)
+        # Load files on a small thread pool so disk reads overlap with
+        # JSON decoding; results come back in file order
+        with ThreadPoolExecutor(
+                max_workers=min(8, len(session_files))) as executor:
+            loaded = list(executor.map(_load_session_file, session_files))
 
-            angle_id = data['session']['angle_id']
+        for angle_id, data in loaded:
             self.sessions[angle_id] = data
 
             # Update LED count
@@ -392,34 +556,85 @@ class TriangulationProcessor:
         print(f"Total angles: {len(self.sessions)}")
         print(f"LED count: {self.led_count}")
 
-    def build_detection_map(self) -> Dict[int, List[Detection2D]]:
+    def get_detection_arrays(self):
         """
-        Build map of LED index to list of detections from all angles.
+        Dense per-(LED, angle) detection arrays, built once from the
+        loaded sessions.
+
+        Streaming the raw detection dicts into flat arrays avoids
+        creating a Detection2D object per detection just to unpack it
+        again in the batched solver; objects are only materialized on
+        demand for visualization (see detections_for_led).
 
         Returns:
-            Dictionary mapping LED index to list of Detection2D objects
+            angle_ids: sorted list of angle ids (column order)
+            pixels: (L, A, 2) float32 pixel coordinates
+            detected: (L, A) bool, True where the session saw the LED
+            occluded: (L, A) bool, True where the detection was occluded
         """
-        detection_map = {}
-
-        for angle_id, session_data in self.sessions.items():
-            for det_data in session_data['detections']:
+        if self._pixels is None:
+            self._build_detection_arrays()
+        return self._angle_ids, self._pixels, self._detected, self._occluded
+
+    def _build_detection_arrays(self):
+        """Stream session detections into the dense arrays."""
+        angle_ids = sorted(self.sessions.keys())
+        num_leds = self.led_count
+        num_angles = len(angle_ids)
+
+        pixels = np.zeros((num_leds, num_angles, 2), dtype=np.float32)
+        detected = np.zeros((num_leds, num_angles), dtype=bool)
+        occluded = np.zeros((num_leds, num_angles), dtype=bool)
+        confidence = np.ones((num_leds, num_angles), dtype=np.float32)
+
+        for col, angle_id in enumerate(angle_ids):
+            for det_data in self.sessions[angle_id]['detections']:
                 led_idx = det_data['led_index']
+                pixels[led_idx, col, 0] = det_data['pixel_x']
+                pixels[led_idx, col, 1] = det_data['pixel_y']
+                detected[led_idx, col] = True
+                occluded[led_idx, col] = det_data['occluded']
+                confidence[led_idx, col] = det_data.get('confidence', 1.0)
+
+        self._angle_ids = angle_ids
+        self._pixels = pixels
+        self._detected = detected
+        self._occluded = occluded
+        self._det_confidence = confidence
+
+    def detections_for_led(self, led_idx: int) -> List[Detection2D]:
+        """
+        Materialize Detection2D objects for one LED.
 
-                detection = Detection2D(
-                    led_index=led_idx,
-                    angle_id=angle_id,
-                    pixel_x=det_data['pixel_x'],
-                    pixel_y=det_data['pixel_y'],
-                    occluded=det_data['occluded'],
-                    confidence=det_data.get('confidence', 1.0)
-                )
-
-                if led_idx not in detection_map:
-                    detection_map[led_idx] = []
+        Only needed by the visualization and scalar-fallback paths; the
+        batched solver works on the arrays directly.
+        """
+        angle_ids, pixels, detected, occluded = self.get_detection_arrays()
+        return [
+            Detection2D(
+                led_index=led_idx,
+                angle_id=angle_ids[col],
+                pixel_x=float(pixels[led_idx, col, 0]),
+                pixel_y=float(pixels[led_idx, col, 1]),
+                occluded=bool(occluded[led_idx, col]),
+                confidence=float(self._det_confidence[led_idx, col])
+            )
+            for col in range(len(angle_ids))
+            if detected[led_idx, col]
+        ]
 
-                detection_map[led_idx].append(detection)
+    def build_detection_map(self) -> Dict[int, List[Detection2D]]:
+        """
+        Build map of LED index to list of detections from all angles.
 
-        return detection_map
+        Returns:
+            Dictionary mapping LED index to list of Detection2D objects
+        """
+        _, _, detected, _ = self.get_detection_arrays()
+        return {
+            int(led_idx): self.detections_for_led(int(led_idx))
+            for led_idx in np.nonzero(detected.any(axis=1))[0]
+        }
 
     def triangulate_all(
         self,
@@ -436,33 +651,149 @@ class TriangulationProcessor:
         Returns:
             List of Position3D objects
         """
-        detection_map = self.build_detection_map()
+        _, _, detected, _ = self.get_detection_arrays()
+        seen_leds = np.nonzero(detected.any(axis=1))[0]
+
+        print(f"\nTriangulating {len(seen_leds)} LEDs...")
+
+        positions = self._triangulate_batched(triangulator)
+        triangulated = {p.led_index for p in positions}
 
-        positions = []
         failed_count = 0
+        for led_idx in seen_leds:
+            if int(led_idx) not in triangulated:
+                failed_count += 1
+                print(f"  Warning: LED {led_idx} failed triangulation (insufficient views)")
 
-        print(f"\nTriangulating {len(detection_map)} LEDs...")
+        # Visualization stays on the scalar per-LED API; Detection2D
+        # objects are only built for the LEDs being shown
+        if visualize_leds is not None:
+            by_index = {p.led_index: p for p in positions}
+            for led_idx in visualize_leds:
+                if led_idx in by_index:
+                    print(f"\nVisualizing LED {led_idx}:")
+                    triangulator.visualize_led_triangulation(
+                        self.detections_for_led(led_idx), by_index[led_idx])
 
-        for led_idx in sorted(detection_map.keys()):
-            detections = detection_map[led_idx]
+        print(f"Successfully triangulated: {len(positions)}/{len(seen_leds)}")
+        print(f"Failed: {failed_count}")
 
-            position = triangulator.triangulate_led(detections)
+        return positions
 
-            if position is not None:
-                position.led_index = led_idx
-                positions.append(position)
+    def _ensure_scratch(self, num_leds: int, num_angles: int):
+        """
+        Return views into the reusable solver buffers, (re)allocating
+        when the current buffers are too small.
+        """
+        if (self._M_buf is None
+                or self._pixels_buf.shape[0] < num_leds
+                or self._pixels_buf.shape[1] < num_angles):
+            self._pixels_buf = np.empty(
+                (num_leds, num_angles, 2), dtype=np.float32)
+            self._dots_buf = np.empty(
+                (num_leds, num_angles), dtype=np.float32)
+            self._M_buf = np.empty((num_leds, 3, 3), dtype=np.float32)
+            self._rhs_buf = np.empty((num_leds, 3), dtype=np.float32)
+        return (
+            self._pixels_buf[:num_leds, :num_angles],
+            self._dots_buf[:num_leds, :num_angles],
+            self._M_buf[:num_leds],
+            self._rhs_buf[:num_leds]
+        )
 
-                # Visualize if requested
-                if visualize_leds is not None and led_idx in visualize_leds:
-                    print(f"\nVisualizing LED {led_idx}:")
-                    triangulator.visualize_led_triangulation(detections, position)
-            else:
-                failed_count += 1
-                print(f"  Warning: LED {led_idx} failed triangulation (insufficient views)")
+    def _triangulate_batched(
+        self,
+        triangulator: SimplifiedTriangulator
+    ) -> List[Position3D]:
+        """
+        Solve every LED's 3x3 system in one stacked NumPy call.
 
-        print(f"Successfully triangulated: {len(positions)}/{len(detection_map)}")
-        print(f"Failed: {failed_count}")
+        Works directly on the dense detection arrays, builds all rays
+        with a single pixels_to_rays call, masks occluded/missing slots
+        out of the normal-equation sums, and lets np.linalg.solve
+        broadcast over the LED axis — a handful of array ops instead of
+        thousands of per-detection NumPy calls.
+        """
+        angle_ids, all_pixels, detected, occluded = self.get_detection_arrays()
+        # Only pack LEDs with at least two usable views; the rest can
+        # never solve, so they are dropped before any ray math
+        valid_all = detected & ~occluded
+        led_indices = [int(i) for i in np.nonzero(valid_all.sum(axis=1) >= 2)[0]]
+        num_leds = len(led_indices)
+        num_angles = len(angle_ids)
+
+        if num_leds == 0:
+            return []
+
+        # Stay in float32 end to end (pixel centroids carry nowhere near
+        # 7 significant digits); only the 3x3 solve promotes to float64
+        pixels, dots, M, rhs = self._ensure_scratch(num_leds, num_angles)
+        rows = np.asarray(led_indices)
+        pixels[:] = all_pixels[rows]
+        angles = np.broadcast_to(
+            np.asarray(angle_ids, dtype=np.float32), (num_leds, num_angles))
+        valid = detected[rows] & ~occluded[rows]
+        totals = detected[rows].sum(axis=1)
+
+        # Rays for every (led, angle) slot at once; invalid slots produce
+        # harmless rays that the mask drops from the sums below
+        origins, dirs = triangulator.pixels_to_rays(
+            pixels.reshape(-1, 2), angles.reshape(-1))
+        origins = origins.reshape(num_leds, num_angles, 3)
+        dirs = dirs.reshape(num_leds, num_angles, 3)
+
+        mask = valid[..., None]
+        ddT = dirs[..., :, None] * dirs[..., None, :]
+        ((np.eye(3, dtype=np.float32) - ddT) * mask[..., None]).sum(
+            axis=1, out=M)
+        np.einsum('laj,laj->la', dirs, origins, out=dots)
+        ((origins - dirs * dots[..., None]) * mask).sum(axis=1, out=rhs)
+
+        counts = valid.sum(axis=1)
+        solvable = counts >= 2
+
+        solutions = np.zeros((num_leds, 3), dtype=np.float32)
+        try:
+            # Trailing singleton axis so solve broadcasts over the LED
+            # axis instead of reading rhs as a single (L, 3) matrix;
+            # promoted to float64 for the factorization only
+            solutions[solvable] = np.linalg.solve(
+                M[solvable].astype(np.float64),
+                rhs[solvable, :, None].astype(np.float64))[:, :, 0]
+        except np.linalg.LinAlgError:
+            # A singular system in the stack poisons the whole batch;
+            # redo everything one LED at a time through the scalar path
+            positions = []
+            for led_idx in led_indices:
+                pos = triangulator.triangulate_led(
+                    self.detections_for_led(led_idx))
+                if pos is not None:
+                    pos.led_index = led_idx
+                    positions.append(pos)
+            return positions
+
+        # Per-LED RMS perpendicular distance over the valid rays
+        to_point = solutions[:, None, :] - origins
+        proj = np.einsum('laj,laj->la', dirs, to_point)
+        perp = to_point - dirs * proj[..., None]
+        dist_sq = np.einsum('laj,laj->la', perp, perp)
+        residuals = np.sqrt(
+            (dist_sq * valid).sum(axis=1) / np.maximum(counts, 1))
+
+        confidences = (counts / np.maximum(totals, 1)) * np.exp(-residuals)
 
+        positions = []
+        for row, led_idx in enumerate(led_indices):
+            if not solvable[row]:
+                continue
+            positions.append(Position3D(
+                led_index=led_idx,
+                x=float(solutions[row, 0]),
+                y=float(solutions[row, 1]),
+                z=float(solutions[row, 2]),
+                confidence=float(confidences[row]),
+                num_views=int(counts[row])
+            ))
         return positions
 
     def export_position_map(
@@ -489,18 +820,15 @@ class TriangulationProcessor:
         # Sort by LED index
         positions = sorted(positions, key=lambda p: p.led_index)
 
-        # Calculate normalization parameters
+        # Calculate normalization parameters on one (N, 3) array rather
+        # than six separate per-field list comprehensions
         if positions:
-            # Get all positions as arrays
-            x_vals = np.array([p.x for p in positions])
-            y_vals = np.array([p.y for p in positions])
-            z_vals = np.array([p.z for p in positions])
+            coords = np.array([[p.x, p.y, p.z] for p in positions])
 
             # Calculate centering offsets
-            median_x = np.median(x_vals)
-            median_y = np.median(y_vals)
-            z_min = z_vals.min()
-            z_max = z_vals.max()
+            median_x, median_y = np.median(coords[:, :2], axis=0)
+            z_min = coords[:, 2].min()
+            z_max = coords[:, 2].max()
             z_center = (z_min + z_max) / 2.0
             z_range = z_max - z_min
 
@@ -515,45 +843,37 @@ class TriangulationProcessor:
             print(f"  Scale factor (1/height): {1.0/z_range:.3f}")
             print(f"  Original height: {z_range:.3f} m")
 
-            # Normalize all positions
-            for pos in positions:
-                pos.x = (pos.x - median_x) / z_range
-                pos.y = (pos.y - median_y) / z_range
-                pos.z = (pos.z - z_center) / z_range
+            # Normalize in place on the array, then write back
+            coords -= (median_x, median_y, z_center)
+            coords /= z_range
+            for pos, row in zip(positions, coords):
+                pos.x, pos.y, pos.z = float(row[0]), float(row[1]), float(row[2])
 
+            c_min = coords.min(axis=0)
+            c_max = coords.max(axis=0)
             print(f"\nNormalized ranges:")
-            x_vals_norm = np.array([p.x for p in positions])
-            y_vals_norm = np.array([p.y for p in positions])
-            z_vals_norm = np.array([p.z for p in positions])
-            print(f"  X: [{x_vals_norm.min():.3f}, {x_vals_norm.max():.3f}]")
-            print(f"  Y: [{y_vals_norm.min():.3f}, {y_vals_norm.max():.3f}]")
-            print(f"  Z: [{z_vals_norm.min():.3f}, {z_vals_norm.max():.3f}] (height = {z_vals_norm.max() - z_vals_norm.min():.3f})")
+            print(f"  X: [{c_min[0]:.3f}, {c_max[0]:.3f}]")
+            print(f"  Y: [{c_min[1]:.3f}, {c_max[1]:.3f}]")
+            print(f"  Z: [{c_min[2]:.3f}, {c_max[2]:.3f}] (height = {c_max[2] - c_min[2]:.3f})")
         else:
             median_x = median_y = z_center = 0.0
             z_range = 1.0
 
-        # Find the maximum LED index to determine array size
-        if positions:
-            max_led_idx = max(p.led_index for p in positions)
-            actual_led_count = max_led_idx + 1
-        else:
-            actual_led_count = 0
-
-        # Create position lookup
-        position_dict = {p.led_index: p for p in positions}
+        # positions is already sorted by LED index, so the last entry
+        # gives the array size and a single walk fills the slots —
+        # no lookup dict needed
+        actual_led_count = positions[-1].led_index + 1 if positions else 0
 
         # Build position map with proper index alignment
         # Use [0, 0, 0] for LEDs that failed triangulation
-        position_array = []
-        missing_leds = []
+        position_array = [[0.0, 0.0, 0.0]] * actual_led_count
+        present = bytearray(actual_led_count)
 
-        for led_idx in range(actual_led_count):
-            if led_idx in position_dict:
-                pos = position_dict[led_idx]
-                position_array.append([pos.x, pos.y, pos.z])
-            else:
-                position_array.append([0.0, 0.0, 0.0])
-                missing_leds.append(led_idx)
+        for pos in positions:
+            position_array[pos.led_index] = [pos.x, pos.y, pos.z]
+            present[pos.led_index] = 1
+
+        missing_leds = [i for i in range(actual_led_count) if not present[i]]
 
         # Build position map
         position_map = {
@@ -588,11 +908,16 @@ class TriangulationProcessor:
                 position_map["metadata"]["missing_led_count_truncated"] = True
 
         # Save to file
-        with open(output_file, 'w') as f:
-            json.dump(position_map, f, indent=2)
+        dump_json(position_map, output_file)
 
         print(f"\n✓ Position map saved to: {output_file}")
 
+        # Also save a binary .npy sidecar (float32) so downstream tools can
+        # mmap-load positions without re-parsing JSON
+        npy_file = output_file.with_suffix('.npy')
+        np.save(npy_file, np.asarray(position_array, dtype=np.float32))
+        print(f"✓ Binary positions saved to: {npy_file}")
+
         if missing_leds:
             print(f"⚠ Warning: {len(missing_leds)} LEDs have placeholder positions [0,0,0]")
             print(f"   These LEDs failed triangulation (occluded or insufficient views)")
@@ -616,8 +941,7 @@ class TriangulationProcessor:
             for pos in positions
         ]
 
-        with open(detailed_file, 'w') as f:
-            json.dump(detailed_map, f, indent=2)
+        dump_json(detailed_map, detailed_file)
 
         print(f"✓ Detailed map saved to: {detailed_file}")
 
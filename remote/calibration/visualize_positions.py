@@ -13,6 +13,21 @@ from mpl_toolkits.mplot3d import Axes3D
 from pathlib import Path
 from typing import Optional
 
+# Optional orjson for faster position map parsing
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def load_json(filepath):
+    """Parse a JSON file, using orjson's C decoder when available."""
+    if HAS_ORJSON:
+        return orjson.loads(Path(filepath).read_bytes())
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
 
 def resolve_position_map_path(filename: str) -> Optional[Path]:
     """
@@ -47,22 +62,22 @@ def resolve_position_map_path(filename: str) -> Optional[Path]:
 
 def load_position_map(filepath):
     """Load position map from JSON file."""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-
-    # Handle both array format and dict format
-    positions = []
-    if isinstance(data['positions'], list):
-        for pos in data['positions']:
-            if isinstance(pos, list):
-                positions.append(pos)
-            elif isinstance(pos, dict):
-                positions.append([pos['x'], pos['y'], pos['z']])
+    data = load_json(filepath)
+
+    # Handle both array format and dict format — detect from the first
+    # entry once and convert the whole list in one shot instead of
+    # dispatching per LED
+    raw = data['positions']
+    if raw and isinstance(raw[0], dict):
+        positions = np.array([[p['x'], p['y'], p['z']] for p in raw])
+    else:
+        positions = np.asarray(raw, dtype=np.float64).reshape(-1, 3)
 
-    return np.array(positions), data.get('metadata', {})
+    return positions, data.get('metadata', {})
 
 
-def visualize_positions(positions, metadata, interactive=True, save_path=None):
+def visualize_positions(positions, metadata, interactive=True, save_path=None,
+                        fast=False):
     """
     Visualize LED positions in 3D.
 
@@ -71,20 +86,51 @@ def visualize_positions(positions, metadata, interactive=True, save_path=None):
         metadata: Metadata dictionary
         interactive: If True, show interactive plot
         save_path: If provided, save plot to this file
+        fast: If True, use point-marker rendering instead of scatter
+            (much faster for large LED counts)
     """
     fig = plt.figure(figsize=(12, 10))
     ax = fig.add_subplot(111, projection='3d')
 
     # Plot points
-    scatter = ax.scatter(
-        positions[:, 0],
-        positions[:, 1],
-        positions[:, 2],
-        c=positions[:, 2],  # Color by height (Z)
-        cmap='viridis',
-        s=20,
-        alpha=0.6
-    )
+    if fast:
+        # Plain point markers instead of scatter: scatter builds one
+        # filled marker per LED, which gets slow for large maps. Keep
+        # the color-by-height look by bucketing Z into a few viridis
+        # levels and drawing each level as a single point cloud.
+        z = positions[:, 2]
+        z_span = z.max() - z.min()
+        z_norm = (z - z.min()) / z_span if z_span > 0 else np.zeros_like(z)
+        num_levels = 16
+        levels = np.minimum((z_norm * num_levels).astype(int), num_levels - 1)
+        cmap = plt.cm.viridis
+        for level in range(num_levels):
+            sel = levels == level
+            if not sel.any():
+                continue
+            ax.plot(
+                positions[sel, 0],
+                positions[sel, 1],
+                positions[sel, 2],
+                linestyle='none',
+                marker='.',
+                markersize=2,
+                color=cmap((level + 0.5) / num_levels),
+                rasterized=True
+            )
+        # Stand-in mappable so the colorbar below still works
+        scatter = plt.cm.ScalarMappable(cmap=cmap)
+        scatter.set_array(z)
+    else:
+        scatter = ax.scatter(
+            positions[:, 0],
+            positions[:, 1],
+            positions[:, 2],
+            c=positions[:, 2],  # Color by height (Z)
+            cmap='viridis',
+            s=20,
+            alpha=0.6
+        )
 
     # Connect points in sequence to show LED strip path
     ax.plot(
@@ -117,27 +163,23 @@ def visualize_positions(positions, metadata, interactive=True, save_path=None):
     height_label = 'Height' if units == 'normalized' else 'Height (m)'
     cbar.set_label(height_label)
 
-    # Equal aspect ratio
-    max_range = np.array([
-        positions[:, 0].max() - positions[:, 0].min(),
-        positions[:, 1].max() - positions[:, 1].min(),
-        positions[:, 2].max() - positions[:, 2].min()
-    ]).max() / 2.0
-
-    mid_x = (positions[:, 0].max() + positions[:, 0].min()) * 0.5
-    mid_y = (positions[:, 1].max() + positions[:, 1].min()) * 0.5
-    mid_z = (positions[:, 2].max() + positions[:, 2].min()) * 0.5
+    # Equal aspect ratio — one min/max pass over the array instead of
+    # rescanning each column for every limit and stat below
+    mn = positions.min(axis=0)
+    mx = positions.max(axis=0)
+    mid = (mn + mx) * 0.5
+    max_range = (mx - mn).max() / 2.0
 
-    ax.set_xlim(mid_x - max_range, mid_x + max_range)
-    ax.set_ylim(mid_y - max_range, mid_y + max_range)
-    ax.set_zlim(mid_z - max_range, mid_z + max_range)
+    ax.set_xlim(mid[0] - max_range, mid[0] + max_range)
+    ax.set_ylim(mid[1] - max_range, mid[1] + max_range)
+    ax.set_zlim(mid[2] - max_range, mid[2] + max_range)
 
     # Add statistics text
     unit_str = '' if units == 'normalized' else ' m'
     stats_text = f"Statistics:\n"
-    stats_text += f"X: [{positions[:, 0].min():.3f}, {positions[:, 0].max():.3f}]{unit_str}\n"
-    stats_text += f"Y: [{positions[:, 1].min():.3f}, {positions[:, 1].max():.3f}]{unit_str}\n"
-    stats_text += f"Z: [{positions[:, 2].min():.3f}, {positions[:, 2].max():.3f}]{unit_str}\n"
+    stats_text += f"X: [{mn[0]:.3f}, {mx[0]:.3f}]{unit_str}\n"
+    stats_text += f"Y: [{mn[1]:.3f}, {mx[1]:.3f}]{unit_str}\n"
+    stats_text += f"Z: [{mn[2]:.3f}, {mx[2]:.3f}]{unit_str}\n"
     stats_text += f"Total span: {max_range * 2:.3f}{unit_str}"
 
     plt.figtext(0.02, 0.02, stats_text, fontsize=9, family='monospace')
@@ -170,45 +212,49 @@ def create_multiple_views(positions, metadata, output_dir):
         ('isometric', 45, 30)
     ]
 
-    for name, azim, elev in viewpoints:
-        fig = plt.figure(figsize=(10, 8))
-        ax = fig.add_subplot(111, projection='3d')
+    # Build the figure and 3D artists once; only the camera changes
+    # between views, so re-creating the scatter/line collections per
+    # viewpoint would just repeat the expensive part
+    fig = plt.figure(figsize=(10, 8))
+    ax = fig.add_subplot(111, projection='3d')
 
-        scatter = ax.scatter(
-            positions[:, 0],
-            positions[:, 1],
-            positions[:, 2],
-            c=positions[:, 2],  # Color by Z (height)
-            cmap='viridis',
-            s=20,
-            alpha=0.6
-        )
+    scatter = ax.scatter(
+        positions[:, 0],
+        positions[:, 1],
+        positions[:, 2],
+        c=positions[:, 2],  # Color by Z (height)
+        cmap='viridis',
+        s=20,
+        alpha=0.6
+    )
 
-        ax.plot(
-            positions[:, 0],
-            positions[:, 1],
-            positions[:, 2],
-            'gray',
-            alpha=0.2,
-            linewidth=0.5
-        )
+    ax.plot(
+        positions[:, 0],
+        positions[:, 1],
+        positions[:, 2],
+        'gray',
+        alpha=0.2,
+        linewidth=0.5
+    )
 
-        ax.set_xlabel(f'X{unit_label}')
-        ax.set_ylabel(f'Y{unit_label}')
-        ax.set_zlabel(f'Z{unit_label}, height')
-        ax.set_title(f"{metadata.get('name', 'LEDs')} - {name.title()} View")
+    ax.set_xlabel(f'X{unit_label}')
+    ax.set_ylabel(f'Y{unit_label}')
+    ax.set_zlabel(f'Z{unit_label}, height')
 
-        ax.view_init(elev=elev, azim=azim)
+    height_label = 'Height' if units == 'normalized' else 'Height (m)'
+    plt.colorbar(scatter, ax=ax, label=height_label)
 
-        height_label = 'Height' if units == 'normalized' else 'Height (m)'
-        plt.colorbar(scatter, ax=ax, label=height_label)
+    for name, azim, elev in viewpoints:
+        ax.set_title(f"{metadata.get('name', 'LEDs')} - {name.title()} View")
+        ax.view_init(elev=elev, azim=azim)
 
         output_file = output_dir / f"view_{name}.png"
-        plt.savefig(output_file, dpi=150, bbox_inches='tight')
-        plt.close()
+        fig.savefig(output_file, dpi=150, bbox_inches='tight')
 
         print(f"  Saved {name} view: {output_file}")
 
+    plt.close(fig)
+
 
 def analyze_positions(positions, metadata):
     """Print detailed analysis of positions."""
@@ -229,14 +275,20 @@ def analyze_positions(positions, metadata):
         else:
             print(f"  {key}: {value}")
 
+    # Single min/max pass reused for the ranges and bounding box
+    mn = positions.min(axis=0)
+    mx = positions.max(axis=0)
+
     print(f"\nPosition Statistics:")
     print(f"  Number of LEDs: {len(positions)}")
-    print(f"  X range: [{positions[:, 0].min():.3f}, {positions[:, 0].max():.3f}]{unit_str}")
-    print(f"  Y range: [{positions[:, 1].min():.3f}, {positions[:, 1].max():.3f}]{unit_str}")
-    print(f"  Z range: [{positions[:, 2].min():.3f}, {positions[:, 2].max():.3f}]{unit_str} (height)")
-
-    # Calculate distances between consecutive LEDs
-    distances = np.linalg.norm(np.diff(positions, axis=0), axis=1)
+    print(f"  X range: [{mn[0]:.3f}, {mx[0]:.3f}]{unit_str}")
+    print(f"  Y range: [{mn[1]:.3f}, {mx[1]:.3f}]{unit_str}")
+    print(f"  Z range: [{mn[2]:.3f}, {mx[2]:.3f}]{unit_str} (height)")
+
+    # Calculate distances between consecutive LEDs; einsum gives the
+    # squared norms without the intermediate arrays norm allocates
+    diff = np.diff(positions, axis=0)
+    distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
     print(f"\nLED Spacing:")
     print(f"  Mean distance: {distances.mean():.3f}{unit_str}")
     print(f"  Std dev:       {distances.std():.3f}{unit_str}")
@@ -256,7 +308,7 @@ def analyze_positions(positions, metadata):
     print(f"\nTotal LED strip length: {total_length:.2f}{unit_str}")
 
     # Bounding box
-    bbox_size = positions.max(axis=0) - positions.min(axis=0)
+    bbox_size = mx - mn
     print(f"\nBounding box size:")
     print(f"  Width (X):  {bbox_size[0]:.2f}{unit_str}")
     print(f"  Depth (Y):  {bbox_size[1]:.2f}{unit_str}")
@@ -291,6 +343,8 @@ Examples:
                        help='Generate multiple viewpoint images in specified directory')
     parser.add_argument('--no-plot', action='store_true',
                        help='Analysis only, do not show plot')
+    parser.add_argument('--fast', action='store_true',
+                       help='Use fast point rendering (recommended for large maps)')
 
     args = parser.parse_args()
 
@@ -324,7 +378,8 @@ Examples:
                 positions,
                 metadata,
                 interactive=(args.save is None),
-                save_path=args.save
+                save_path=args.save,
+                fast=args.fast
             )
 
 
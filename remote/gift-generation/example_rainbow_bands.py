@@ -14,6 +14,42 @@ import numpy as np
 from pathlib import Path
 from gift_creator import GIFTCreator, hsv_to_rgb
 
+# Optional numba for the fused band-assignment kernel; the vectorized
+# NumPy frame loop remains the fallback
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True, fastmath=True)
+    def _fill_bands(out, z_norm, palette, boundaries, speed, framerate,
+                    duration):
+        """
+        Write every frame's band colors into out (F, N, 3) in one
+        parallel pass, fusing the shift/wrap/bucket/gather chain with
+        no per-frame temporaries.
+        """
+        num_frames = out.shape[0]
+        num_leds = z_norm.shape[0]
+        for frame_idx in prange(num_frames):
+            # Same cycle offset as the frame loop: speed * t / duration
+            cycles = speed * (frame_idx / framerate) / duration
+            for i in range(num_leds):
+                z_animated = (z_norm[i] - cycles) % 1.0
+                band = np.searchsorted(boundaries, z_animated,
+                                       side='right')
+                out[frame_idx, i, 0] = palette[band, 0]
+                out[frame_idx, i, 1] = palette[band, 1]
+                out[frame_idx, i, 2] = palette[band, 2]
+
+    # Warm the kernel at import so the first animation doesn't pay
+    # the compile cost mid-run (cached across processes)
+    _fill_bands(np.empty((1, 1, 3), dtype=np.uint8), np.zeros(1),
+                np.zeros((1, 3), dtype=np.uint8), np.zeros(0), 1.0,
+                30.0, 1.0)
+
 
 def create_rainbow_bands_animation(
     position_map_path: str,
@@ -75,49 +111,39 @@ def create_rainbow_bands_animation(
     num_frames = int(duration * framerate)
     print(f"Generating {num_frames} frames...")
 
-    frames_generated = 0
-    for frame_idx in range(num_frames):
-        # Calculate time offset for this frame
-        t = frame_idx / framerate
-
-        # Offset for band positions (moves downward with periodic boundary)
-        # We want the bands to cycle through completely during the animation
-        # Number of complete cycles = speed
-        cycles = speed * t / duration
-        z_offset = cycles * z_range
-
-        # Determine color for each LED
-        frame_colors = []
-        for led_idx in range(creator.led_count):
-            z = z_positions[led_idx]
-
-            # Normalize Z position to [0, 1] within the range
-            z_norm = (z - z_min) / z_range
+    # Per-LED quantities that never change between frames: normalized Z
+    # position and the band color palette as an indexable array
+    z_norm = (z_positions - z_min) / z_range
+    palette = np.array(rainbow_colors, dtype=np.uint8)
 
-            # Add offset (moves bands down)
-            # Subtract offset because positive Z is up, and we want bands to fall down
-            z_animated = z_norm - (z_offset / z_range)
+    # Interior band boundaries [1/B, ..., (B-1)/B]; bucketing a wrapped
+    # z in [0, 1) is then a searchsorted instead of multiply/cast/modulo
+    boundaries = np.arange(1, num_bands) / num_bands
 
-            # Apply periodic boundary conditions
-            z_animated = z_animated % 1.0
-
-            # Determine which band this LED is in
-            band_idx = int(z_animated * num_bands) % num_bands
-
-            # Get color for this band
-            color = rainbow_colors[band_idx]
-            frame_colors.append(color)
-
-        # Add frame to animation
-        creator.add_frame(frame_colors)
-        frames_generated += 1
-
-        # Progress indicator
-        if (frame_idx + 1) % 30 == 0 or frame_idx == num_frames - 1:
-            progress = (frame_idx + 1) / num_frames * 100
-            print(f"  Progress: {progress:5.1f}% ({frame_idx + 1}/{num_frames} frames)")
-
-    print()
+    frames_generated = 0
+    if HAS_NUMBA:
+        # Fused compiled kernel fills every frame in one parallel call
+        all_frames = np.empty(
+            (num_frames, creator.led_count, 3), dtype=np.uint8)
+        _fill_bands(all_frames, z_norm.astype(np.float64), palette,
+                    boundaries, speed, framerate, duration)
+        creator.add_frames_bulk(all_frames)
+        frames_generated = num_frames
+    else:
+        # Whole animation as one (F, N) broadcast: per-frame cycle
+        # offsets down the first axis, per-LED normalized Z down the
+        # second. Same cycles = speed * t / duration formula as the
+        # kernel, hoisted to an array over all frame times at once.
+        t = np.arange(num_frames) / framerate
+        cycles = speed * t / duration
+        z_animated = (z_norm[None, :] - cycles[:, None]) % 1.0
+        band_idx = np.searchsorted(boundaries, z_animated, side='right')
+        creator.add_frames_bulk(palette[band_idx])
+        frames_generated = num_frames
+
+    # Both paths generate the whole animation in one call, so the old
+    # per-frame progress prints are gone; "Generating ..." above and the
+    # completion line below bracket the work instead
     print(f"✓ Generated {frames_generated} frames")
     print()
 
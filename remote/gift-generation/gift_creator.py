@@ -7,11 +7,25 @@ Format: CSV with frame_id, R_1, G_1, B_1, R_2, G_2, B_2, ...
 """
 
 import json
-import csv
 from pathlib import Path
 from typing import List, Optional, Tuple
 import numpy as np
 
+# Optional orjson for faster position map parsing
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def load_json(filepath):
+    """Parse a JSON file, using orjson's C decoder when available."""
+    if HAS_ORJSON:
+        return orjson.loads(Path(filepath).read_bytes())
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
 
 class LEDPosition:
     """3D position of an LED."""
@@ -42,9 +56,43 @@ class GIFTCreator:
         """
         self.led_count = led_count
         self.framerate = framerate
-        self.frames: List[List[Tuple[int, int, int]]] = []
-        self.positions: Optional[List[LEDPosition]] = None
+        self._positions: Optional[np.ndarray] = None  # (N, 3) float32
         self.unmapped_leds: set = set()  # Track LEDs without valid positions
+        self._unmapped_idx = np.empty(0, dtype=np.int64)  # cached index array
+
+        # Frames live in one contiguous (capacity, led_count, 3) uint8
+        # buffer grown by doubling — 3 bytes per LED per frame instead
+        # of a Python tuple (~56 bytes) per LED
+        self._frames_buf: Optional[np.ndarray] = None
+        self._n_frames = 0
+
+    @property
+    def frames(self) -> np.ndarray:
+        """Frames written so far as a (F, led_count, 3) uint8 view."""
+        if self._frames_buf is None:
+            return np.empty((0, self.led_count or 0, 3), dtype=np.uint8)
+        return self._frames_buf[:self._n_frames]
+
+    def _next_frame_slot(self) -> np.ndarray:
+        """Return the next free frame slot, growing the buffer as needed."""
+        if self._frames_buf is None:
+            self._frames_buf = np.empty(
+                (64, self.led_count, 3), dtype=np.uint8)
+        elif self._n_frames == self._frames_buf.shape[0]:
+            grown = np.empty(
+                (self._frames_buf.shape[0] * 2, self.led_count, 3),
+                dtype=np.uint8)
+            grown[:self._n_frames] = self._frames_buf
+            self._frames_buf = grown
+        return self._frames_buf[self._n_frames]
+
+    def _unmapped_index(self) -> np.ndarray:
+        """Unmapped LED indices as an array, resynced if the set changed."""
+        if self._unmapped_idx.size != len(self.unmapped_leds):
+            self._unmapped_idx = np.fromiter(
+                sorted(self.unmapped_leds), dtype=np.int64,
+                count=len(self.unmapped_leds))
+        return self._unmapped_idx
 
     def _resolve_position_map_path(self, filepath: str) -> Optional[Path]:
         """
@@ -106,34 +154,32 @@ class GIFTCreator:
                 f"  - ../../pi/GIFT/position_maps/{filepath}"
             )
 
-        with open(resolved_path, 'r') as f:
-            data = json.load(f)
-
-        self.positions = []
-        self.unmapped_leds = set()
-
-        # Handle both array format and dict format
-        if isinstance(data['positions'], list):
-            for idx, pos in enumerate(data['positions']):
-                if isinstance(pos, list):
-                    self.positions.append(LEDPosition(idx, pos[0], pos[1], pos[2]))
-                    # Check if this is an unmapped LED (at origin)
-                    if pos[0] == 0.0 and pos[1] == 0.0 and pos[2] == 0.0:
-                        self.unmapped_leds.add(idx)
-                elif isinstance(pos, dict):
-                    self.positions.append(LEDPosition(idx, pos['x'], pos['y'], pos['z']))
-                    # Check if this is an unmapped LED (at origin)
-                    if pos['x'] == 0.0 and pos['y'] == 0.0 and pos['z'] == 0.0:
-                        self.unmapped_leds.add(idx)
+        data = load_json(resolved_path)
+
+        # Detect the entry format once, then convert the whole list in
+        # one shot; positions are stored as a single (N, 3) float32
+        # array rather than a Python object per LED
+        raw = data['positions']
+        if raw and isinstance(raw[0], dict):
+            self._positions = np.array(
+                [[p['x'], p['y'], p['z']] for p in raw], dtype=np.float32)
+        else:
+            self._positions = np.asarray(raw, dtype=np.float32).reshape(-1, 3)
+
+        # Unmapped LEDs sit at the origin; keep both the set (public
+        # API) and a sorted index array for fast frame masking
+        unmapped_mask = np.all(self._positions == 0.0, axis=1)
+        self._unmapped_idx = np.nonzero(unmapped_mask)[0].astype(np.int64)
+        self.unmapped_leds = set(self._unmapped_idx.tolist())
 
         # Set or verify LED count
         if self.led_count is None:
-            self.led_count = len(self.positions)
+            self.led_count = len(self._positions)
             print(f"✓ Inferred LED count from position map: {self.led_count}")
-        elif len(self.positions) != self.led_count:
-            print(f"Warning: Position map has {len(self.positions)} LEDs, but creator was initialized with {self.led_count}")
-            print(f"  Using position map LED count: {len(self.positions)}")
-            self.led_count = len(self.positions)
+        elif len(self._positions) != self.led_count:
+            print(f"Warning: Position map has {len(self._positions)} LEDs, but creator was initialized with {self.led_count}")
+            print(f"  Using position map LED count: {len(self._positions)}")
+            self.led_count = len(self._positions)
 
         # Report unmapped LEDs
         if self.unmapped_leds:
@@ -145,16 +191,37 @@ class GIFTCreator:
                 print(f"  First 10 unmapped LEDs: {unmapped_sorted[:10]}")
                 print(f"  (and {len(self.unmapped_leds) - 10} more...)")
 
-    def add_frame(self, colors: List[Tuple[int, int, int]]):
+    def add_frame(self, colors):
         """
         Add a frame to the animation.
 
         Args:
-            colors: List of (R, G, B) tuples, one per LED
+            colors: List of (R, G, B) tuples, one per LED, or an
+                (led_count, 3) integer ndarray as produced by
+                vectorized animation builders
         """
         if self.led_count is None:
             raise ValueError("LED count not set. Either specify led_count in __init__ or load a position map first.")
 
+        if isinstance(colors, np.ndarray):
+            # Array fast path: validate with two C-level reductions
+            # instead of a per-LED Python loop
+            if colors.shape != (self.led_count, 3):
+                raise ValueError(
+                    f"Expected shape ({self.led_count}, 3), got {colors.shape}")
+            if colors.min() < 0 or colors.max() > 255:
+                raise ValueError("RGB values must be 0-255")
+
+            frame = self._next_frame_slot()
+            frame[:] = colors
+
+            # Override unmapped LEDs to black with one fancy-indexed store
+            if self.unmapped_leds:
+                frame[self._unmapped_index()] = 0
+
+            self._n_frames += 1
+            return
+
         if len(colors) != self.led_count:
             raise ValueError(f"Expected {self.led_count} colors, got {len(colors)}")
 
@@ -163,14 +230,14 @@ class GIFTCreator:
             if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
                 raise ValueError(f"LED {i}: RGB values must be 0-255, got ({r}, {g}, {b})")
 
+        frame = self._next_frame_slot()
+        frame[:] = colors
+
         # Override unmapped LEDs to black
         if self.unmapped_leds:
-            colors = list(colors)  # Make mutable copy
-            for led_idx in self.unmapped_leds:
-                if led_idx < len(colors):
-                    colors[led_idx] = (0, 0, 0)
+            frame[self._unmapped_index()] = 0
 
-        self.frames.append(colors)
+        self._n_frames += 1
 
     def add_frames(self, frames: List[List[Tuple[int, int, int]]]):
         """
@@ -182,7 +249,52 @@ class GIFTCreator:
         for frame in frames:
             self.add_frame(frame)
 
-    def export(self, filepath: str, loop: bool = True):
+    def add_frames_bulk(self, frames: np.ndarray):
+        """
+        Append a whole (F, led_count, 3) block of frames at once.
+
+        Validates shape and RGB range once for the block, blacks out
+        unmapped LEDs with one broadcast store, and copies everything
+        into the frame buffer in a single slice assignment — the bulk
+        counterpart to the per-frame ndarray path in add_frame.
+
+        Args:
+            frames: (F, led_count, 3) integer array
+        """
+        if self.led_count is None:
+            raise ValueError("LED count not set. Either specify led_count in __init__ or load a position map first.")
+
+        frames = np.asarray(frames)
+        if frames.ndim != 3 or frames.shape[1:] != (self.led_count, 3):
+            raise ValueError(
+                f"Expected shape (F, {self.led_count}, 3), got {frames.shape}")
+        if frames.size == 0:
+            return
+        if frames.min() < 0 or frames.max() > 255:
+            raise ValueError("RGB values must be 0-255")
+
+        # Grow capacity for the whole block in one reallocation
+        needed = self._n_frames + frames.shape[0]
+        if self._frames_buf is None:
+            self._frames_buf = np.empty(
+                (max(64, needed), self.led_count, 3), dtype=np.uint8)
+        elif needed > self._frames_buf.shape[0]:
+            grown = np.empty(
+                (max(self._frames_buf.shape[0] * 2, needed),
+                 self.led_count, 3), dtype=np.uint8)
+            grown[:self._n_frames] = self._frames_buf[:self._n_frames]
+            self._frames_buf = grown
+
+        self._frames_buf[self._n_frames:needed] = frames
+        if self.unmapped_leds:
+            self._frames_buf[self._n_frames:needed,
+                             self._unmapped_index(), :] = 0
+        self._n_frames = needed
+
+    # Magic prefix for the compact binary variant of the GIFT format
+    BINARY_MAGIC = b'GIFTB\x01'
+
+    def export(self, filepath: str, loop: bool = True, binary: bool = False):
         """
         Export animation to GIFT file.
 
@@ -192,6 +304,9 @@ class GIFTCreator:
         Args:
             filepath: Output file path (.gift extension recommended) or just filename
             loop: Whether animation should loop
+            binary: If True, write the compact binary format (JSON
+                header + raw uint8 frame data, ~4x smaller than CSV)
+                instead of the plain-text CSV format
         """
         filepath = Path(filepath)
 
@@ -206,6 +321,28 @@ class GIFTCreator:
 
             filepath = gifts_dir / filepath
 
+        if binary:
+            # Magic + length-prefixed JSON header, then the frame buffer
+            # dumped as raw uint8 (F, N, 3) — one tofile call instead of
+            # stringifying 3N ints per frame
+            header = json.dumps({
+                'led_count': self.led_count,
+                'frame_count': self._n_frames,
+                'framerate': self.framerate,
+                'loop': loop
+            }).encode('utf-8')
+            with open(filepath, 'wb') as f:
+                f.write(self.BINARY_MAGIC)
+                f.write(len(header).to_bytes(4, 'little'))
+                f.write(header)
+                if self._n_frames:
+                    self._frames_buf[:self._n_frames].tofile(f)
+
+            print(f"✓ Exported {self._n_frames} frames to {filepath} (binary)")
+            print(f"  LEDs: {self.led_count}")
+            print(f"  Duration: {self._n_frames / self.framerate:.2f}s @ {self.framerate}fps")
+            return
+
         with open(filepath, 'w', newline='') as f:
             # Write metadata header
             f.write(f"# GIFT Animation File\n")
@@ -216,26 +353,41 @@ class GIFTCreator:
             f.write(f"# duration: {len(self.frames) / self.framerate:.2f}s\n")
             f.write(f"# loop: {loop}\n")
 
-            # Write CSV data
-            writer = csv.writer(f)
-
             # Header row
             header = ['frame_id']
             for i in range(self.led_count):
                 header.extend([f'R_{i}', f'G_{i}', f'B_{i}'])
-            writer.writerow(header)
-
-            # Data rows
-            for frame_id, frame_colors in enumerate(self.frames):
-                row = [frame_id]
-                for r, g, b in frame_colors:
-                    row.extend([r, g, b])
-                writer.writerow(row)
+            f.write(','.join(header) + '\n')
+
+            # Data rows: stack everything into one (F, 1 + 3N) int
+            # array with the frame ids prepended and let np.savetxt do
+            # the stringification, instead of building a Python list and
+            # str()-ing 3N ints per frame
+            if self._n_frames:
+                frames_arr = self.frames.reshape(
+                    self._n_frames, -1).astype(np.int64)
+                frame_ids = np.arange(
+                    self._n_frames, dtype=np.int64).reshape(-1, 1)
+                np.savetxt(f, np.hstack([frame_ids, frames_arr]),
+                           fmt='%d', delimiter=',')
 
         print(f"✓ Exported {len(self.frames)} frames to {filepath}")
         print(f"  LEDs: {self.led_count}")
         print(f"  Duration: {len(self.frames) / self.framerate:.2f}s @ {self.framerate}fps")
 
+    @property
+    def positions(self) -> Optional[List[LEDPosition]]:
+        """
+        Positions as LEDPosition objects, for callers expecting the old
+        list API; materialized on demand from the position array.
+        """
+        if self._positions is None:
+            return None
+        return [
+            LEDPosition(idx, float(x), float(y), float(z))
+            for idx, (x, y, z) in enumerate(self._positions)
+        ]
+
     def get_positions_array(self) -> np.ndarray:
         """
         Get LED positions as numpy array.
@@ -243,10 +395,10 @@ class GIFTCreator:
         Returns:
             Nx3 array of (x, y, z) positions
         """
-        if self.positions is None:
+        if self._positions is None:
             raise ValueError("No position map loaded")
 
-        return np.array([[p.x, p.y, p.z] for p in self.positions])
+        return self._positions
 
     def get_positions_by_z(self) -> List[Tuple[int, float]]:
         """
@@ -255,10 +407,12 @@ class GIFTCreator:
         Returns:
             List of (led_index, z_position) tuples sorted by z
         """
-        if self.positions is None:
+        if self._positions is None:
             raise ValueError("No position map loaded")
 
-        return sorted([(p.index, p.z) for p in self.positions], key=lambda x: x[1])
+        z = self._positions[:, 2]
+        order = np.argsort(z, kind='stable')
+        return [(int(i), float(z[i])) for i in order]
 
     def is_mapped(self, led_index: int) -> bool:
         """
@@ -310,6 +464,78 @@ def hsv_to_rgb(h: float, s: float, v: float) -> Tuple[int, int, int]:
     )
 
 
+# JIT-compiled variant, callable from inside numba animation kernels
+# without dropping to object mode. Plain Python callers should keep
+# using hsv_to_rgb; when numba is missing the name simply aliases it.
+try:
+    from numba import njit as _njit
+
+    @_njit(cache=True, fastmath=True)
+    def _hsv_to_rgb_nb(h, s, v):
+        h = h % 360
+        c = v * s
+        x = c * (1 - abs((h / 60) % 2 - 1))
+        m = v - c
+
+        if h < 60:
+            r, g, b = c, x, 0.0
+        elif h < 120:
+            r, g, b = x, c, 0.0
+        elif h < 180:
+            r, g, b = 0.0, c, x
+        elif h < 240:
+            r, g, b = 0.0, x, c
+        elif h < 300:
+            r, g, b = x, 0.0, c
+        else:
+            r, g, b = c, 0.0, x
+
+        return (
+            int((r + m) * 255),
+            int((g + m) * 255),
+            int((b + m) * 255)
+        )
+
+    hsv_to_rgb_jit = _hsv_to_rgb_nb
+except ImportError:
+    hsv_to_rgb_jit = hsv_to_rgb
+
+
+def hsv_to_rgb_array(h, s, v) -> np.ndarray:
+    """
+    Convert HSV to RGB on whole arrays.
+
+    Same math as hsv_to_rgb, but the hue-sector branching is evaluated
+    with np.select so palettes and per-LED gradients are computed in a
+    single vector pass instead of one Python call per color.
+
+    Args:
+        h: Hue (0-360), scalar or array
+        s: Saturation (0-1), scalar or array
+        v: Value (0-1), scalar or array
+
+    Returns:
+        (..., 3) uint8 array of RGB values
+    """
+    h = np.mod(np.asarray(h, dtype=np.float64), 360)
+    s = np.asarray(s, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+
+    c = v * s
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+    m = v - c
+
+    sectors = [h < 60, h < 120, h < 180, h < 240, h < 300]
+    zero = np.zeros_like(c)
+    r = np.select(sectors, [c, x, zero, zero, x], default=c)
+    g = np.select(sectors, [x, c, c, x, zero], default=zero)
+    b = np.select(sectors, [zero, zero, x, c, c], default=x)
+
+    return np.stack(
+        [(r + m) * 255, (g + m) * 255, (b + m) * 255],
+        axis=-1).astype(np.uint8)
+
+
 if __name__ == '__main__':
     # Example usage
     print("GIFT Creator Library")
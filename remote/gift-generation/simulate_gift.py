@@ -8,14 +8,26 @@ Shows what the animation would look like on the actual tree.
 
 import argparse
 import csv
+import io
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+
+# Optional pandas for its C CSV parser; the csv.reader loop remains
+# the fallback
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
+from matplotlib.animation import FFMpegWriter, FuncAnimation
 from matplotlib.widgets import Button, Slider
 from mpl_toolkits.mplot3d import Axes3D
 
@@ -92,6 +104,36 @@ def resolve_position_map_path(filename: str) -> Optional[Path]:
     return None
 
 
+# Per-process state for parallel preview export: the simulator is
+# shipped to each worker once via the pool initializer, and each worker
+# builds its figure lazily on first use instead of per task
+_worker_sim = None
+_worker_fig = None
+
+
+def _preview_worker_init(sim):
+    """Pool initializer: stash the simulator and force the Agg backend."""
+    global _worker_sim
+    import matplotlib
+    matplotlib.use('Agg')
+    _worker_sim = sim
+
+
+def _render_preview_frame(task):
+    """Render one (frame, view) preview PNG in a worker process."""
+    global _worker_fig
+    frame_idx, elev, azim, outpath = task
+    if _worker_fig is None:
+        _worker_fig = _worker_sim._make_preview_figure(
+            _worker_sim.get_frame_colors(frame_idx))
+    fig, ax, scatter = _worker_fig
+    scatter.set_facecolors(_worker_sim.get_frame_colors(frame_idx))
+    ax.view_init(elev=elev, azim=azim)
+    ax.set_title(f"{_worker_sim.gift_path.stem} - Frame {frame_idx}")
+    fig.savefig(outpath, dpi=150, bbox_inches='tight')
+    return Path(outpath).name
+
+
 class GIFTSimulator:
     """Simulate and visualize GIFT animations."""
 
@@ -106,9 +148,14 @@ class GIFTSimulator:
         self.gift_path = Path(gift_path)
         self.position_map_path = Path(position_map_path)
 
-        # Animation data
+        # Animation data: only the (F, N, 3) uint8 tensor stays
+        # resident — 3 bytes per LED per frame, the smallest decoded
+        # representation. The requested row is normalized into a reused
+        # float32 buffer on demand.
         self.metadata = {}
-        self.frames = []
+        self._frames_u8 = np.empty((0, 0, 3), dtype=np.uint8)
+        self._color_buf = np.empty((0, 3), dtype=np.float32)
+        self.frame_count = 0
         self.positions = None
         self.led_count = 0
 
@@ -117,6 +164,8 @@ class GIFTSimulator:
         self.playing = True
         self.speed = 1.0
         self.loop = True
+        self._last_drawn_frame = -1
+        self._anim = None
 
         # Load data
         self._load_position_map()
@@ -132,66 +181,82 @@ class GIFTSimulator:
         self.positions = np.array(positions_data)
         self.led_count = len(self.positions)
 
+        # Extents are needed for every axis-limit computation; scan the
+        # array once here instead of per plot (or worse, per exported
+        # frame)
+        self._pmin = self.positions.min(axis=0)
+        self._pmax = self.positions.max(axis=0)
+        self._mid = 0.5 * (self._pmin + self._pmax)
+        self._max_range = 0.5 * (self._pmax - self._pmin).max()
+
         print(f"✓ Loaded {self.led_count} LED positions")
-        print(f"  X range: [{self.positions[:, 0].min():.3f}, {self.positions[:, 0].max():.3f}]")
-        print(f"  Y range: [{self.positions[:, 1].min():.3f}, {self.positions[:, 1].max():.3f}]")
-        print(f"  Z range: [{self.positions[:, 2].min():.3f}, {self.positions[:, 2].max():.3f}]")
+        print(f"  X range: [{self._pmin[0]:.3f}, {self._pmax[0]:.3f}]")
+        print(f"  Y range: [{self._pmin[1]:.3f}, {self._pmax[1]:.3f}]")
+        print(f"  Z range: [{self._pmin[2]:.3f}, {self._pmax[2]:.3f}]")
 
     def _load_gift_file(self):
         """Load GIFT animation file."""
         print(f"\nLoading GIFT file: {self.gift_path}")
 
-        with open(self.gift_path, 'r') as f:
-            # Parse metadata from comments
-            for line in f:
-                line = line.strip()
-                if not line.startswith('#'):
-                    break
-                if ':' in line:
-                    # Parse metadata: # key: value
-                    parts = line[1:].split(':', 1)
-                    if len(parts) == 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip()
-                        self.metadata[key] = value
-
-            # Parse CSV data
-            f.seek(0)  # Reset to beginning
-            reader = csv.reader(f)
-
-            # Skip comments and get header
-            header = None
-            for row in reader:
-                if not row or (row[0].startswith('#')):
-                    continue
-                header = row
+        # Read the file once; both the metadata scan and the CSV parse
+        # work from the same bytes instead of opening/seeking twice
+        raw = self.gift_path.read_bytes()
+
+        # Parse metadata from the leading comment lines
+        pos = 0
+        while pos < len(raw):
+            end = raw.find(b'\n', pos)
+            if end == -1:
+                end = len(raw)
+            line = raw[pos:end].strip()
+            if not line.startswith(b'#'):
                 break
-
-            if header is None or header[0] != 'frame_id':
+            if b':' in line:
+                # Parse metadata: # key: value
+                parts = line[1:].decode('utf-8', 'replace').split(':', 1)
+                if len(parts) == 2:
+                    key = parts[0].strip()
+                    value = parts[1].strip()
+                    self.metadata[key] = value
+            pos = end + 1
+
+        if HAS_PANDAS:
+            # Whole-file C parse; the tight tokenize/convert loop
+            # never touches the interpreter
+            df = pd.read_csv(io.BytesIO(raw), comment='#',
+                             engine='c', dtype=np.uint32)
+            if len(df.columns) == 0 or df.columns[0] != 'frame_id':
                 raise ValueError("Invalid GIFT file: missing or invalid header")
 
-            # Read frame data
-            for row in reader:
-                if not row or row[0].startswith('#'):
-                    continue
-
-                frame_id = int(row[0])
-                colors = []
-
-                # Parse RGB triplets
-                for i in range(1, len(row), 3):
-                    if i + 2 < len(row):
-                        r = int(row[i])
-                        g = int(row[i + 1])
-                        b = int(row[i + 2])
-                        colors.append((r, g, b))
-
-                self.frames.append(colors)
+            data = df.to_numpy()
+            file_led_count = (data.shape[1] - 1) // 3
+            if len(data):
+                n_frames = int(data[:, 0].max()) + 1
+                frames_u8 = np.zeros(
+                    (n_frames, file_led_count, 3), dtype=np.uint8)
+                frames_u8[data[:, 0]] = data[
+                    :, 1:1 + file_led_count * 3].astype(
+                        np.uint8).reshape(-1, file_led_count, 3)
+            else:
+                n_frames = 0
+                frames_u8 = np.zeros(
+                    (0, file_led_count, 3), dtype=np.uint8)
+
+            self._frames_u8 = frames_u8
+            self.frame_count = n_frames
+        else:
+            self._parse_rows(io.StringIO(raw.decode('utf-8')))
+
+        # One reused float32 row for get_frame_colors; frames stay in
+        # uint8 so a multi-minute animation costs 3 bytes per LED per
+        # frame and nothing more
+        self._color_buf = np.empty(
+            (self._frames_u8.shape[1], 3), dtype=np.float32)
 
         # Parse metadata values
         self.loop = self.metadata.get('loop', 'True').lower() == 'true'
 
-        print(f"✓ Loaded {len(self.frames)} frames")
+        print(f"✓ Loaded {self.frame_count} frames")
         print(f"  LED count: {self.metadata.get('led_count', 'unknown')}")
         print(f"  Frame count: {self.metadata.get('frame_count', 'unknown')}")
         print(f"  Framerate: {self.metadata.get('framerate', 'unknown')} fps")
@@ -199,13 +264,65 @@ class GIFTSimulator:
         print(f"  Loop: {self.loop}")
 
         # Verify LED count matches
-        if self.frames:
-            frame_led_count = len(self.frames[0])
+        if self.frame_count:
+            frame_led_count = self._frames_u8.shape[1]
             if frame_led_count != self.led_count:
                 print(f"\n⚠ Warning: Frame has {frame_led_count} LEDs, but position map has {self.led_count}")
                 print(f"  Using minimum: {min(frame_led_count, self.led_count)}")
                 self.led_count = min(frame_led_count, self.led_count)
 
+    def _parse_rows(self, f):
+        """Row-at-a-time CSV parse used when pandas is unavailable."""
+        f.seek(0)  # Reset to beginning
+        reader = csv.reader(f)
+
+        # Skip comments and get header
+        header = None
+        for row in reader:
+            if not row or (row[0].startswith('#')):
+                continue
+            header = row
+            break
+
+        if header is None or header[0] != 'frame_id':
+            raise ValueError("Invalid GIFT file: missing or invalid header")
+
+        # Read frame data straight into a contiguous (F, N, 3) uint8
+        # tensor — one ndarray conversion per row instead of three
+        # int() calls per LED and a tuple per color
+        file_led_count = (len(header) - 1) // 3
+        try:
+            expected_frames = int(self.metadata.get('frame_count', ''))
+        except ValueError:
+            expected_frames = 0
+
+        frames_u8 = np.zeros(
+            (expected_frames, file_led_count, 3), dtype=np.uint8)
+        n_frames = 0
+        for row in reader:
+            if not row or row[0].startswith('#'):
+                continue
+
+            frame_id = int(row[0])
+            if frame_id >= frames_u8.shape[0]:
+                grown = np.zeros(
+                    (max(frames_u8.shape[0] * 2, frame_id + 1),
+                     file_led_count, 3), dtype=np.uint8)
+                grown[:n_frames] = frames_u8[:n_frames]
+                frames_u8 = grown
+            frames_u8[frame_id] = np.asarray(
+                row[1:1 + file_led_count * 3],
+                dtype=np.uint8).reshape(file_led_count, 3)
+            n_frames = max(n_frames, frame_id + 1)
+
+        self._frames_u8 = frames_u8[:n_frames]
+        self.frame_count = n_frames
+
+    @property
+    def frames(self) -> np.ndarray:
+        """Frame data as a (frame_count, led_count, 3) uint8 array."""
+        return self._frames_u8
+
     def get_frame_colors(self, frame_idx: int) -> np.ndarray:
         """
         Get colors for a specific frame as RGB array (0-1 range).
@@ -214,20 +331,22 @@ class GIFTSimulator:
             frame_idx: Frame index
 
         Returns:
-            Nx3 array of RGB colors (0-1 range)
+            Nx3 array of RGB colors (0-1 range); a reused buffer the
+            requested uint8 row is normalized into, so no per-frame
+            allocation
         """
-        if not self.frames:
-            return np.zeros((self.led_count, 3))
-
-        frame_idx = frame_idx % len(self.frames)
-        colors = self.frames[frame_idx]
+        if not self.frame_count:
+            return np.zeros((self.led_count, 3), dtype=np.float32)
 
-        # Convert to numpy array and normalize to 0-1 range
-        rgb_array = np.array(colors[:self.led_count], dtype=float) / 255.0
-        return rgb_array
+        buf = self._color_buf[:self.led_count]
+        np.multiply(self._frames_u8[frame_idx % self.frame_count,
+                                    :self.led_count],
+                    np.float32(1.0 / 255.0), out=buf)
+        return buf
 
     def visualize(self, view_angle: Tuple[float, float] = (30, 45),
-                  marker_size: int = 100, show_axes: bool = True):
+                  marker_size: int = 100, show_axes: bool = True,
+                  show_strip: bool = False):
         """
         Create interactive 3D visualization of animation.
 
@@ -235,6 +354,7 @@ class GIFTSimulator:
             view_angle: Initial view angle (elevation, azimuth)
             marker_size: Size of LED markers
             show_axes: Whether to show coordinate axes
+            show_strip: Draw the gray LED strip path line
         """
         print(f"\n{'='*60}")
         print("Starting GIFT Simulator")
@@ -253,6 +373,10 @@ class GIFTSimulator:
         # Initial frame colors
         colors = self.get_frame_colors(0)
 
+        # Stroking an edge around every marker costs one rasterizer
+        # pass per LED per frame; only worth it on small strips
+        edgecolors = 'black' if self.led_count <= 200 else 'none'
+
         # Create scatter plot
         scatter = ax.scatter(
             self.positions[:, 0],
@@ -261,19 +385,23 @@ class GIFTSimulator:
             c=colors,
             s=marker_size,
             alpha=0.9,
-            edgecolors='black',
+            edgecolors=edgecolors,
             linewidths=0.5
         )
 
-        # Optional: Draw LED strip path
-        ax.plot(
-            self.positions[:, 0],
-            self.positions[:, 1],
-            self.positions[:, 2],
-            'gray',
-            alpha=0.15,
-            linewidth=0.5
-        )
+        # Optional: Draw LED strip path. Off by default — with blitting
+        # the line is part of the static background and drawn once, but
+        # it still costs an N-vertex 3D projection and stroke on every
+        # full redraw (rotate/zoom/resize)
+        if show_strip:
+            ax.plot(
+                self.positions[:, 0],
+                self.positions[:, 1],
+                self.positions[:, 2],
+                'gray',
+                alpha=0.15,
+                linewidth=0.5
+            )
 
         # Set view
         ax.view_init(elev=view_angle[0], azim=view_angle[1])
@@ -283,40 +411,33 @@ class GIFTSimulator:
         ax.set_ylabel('Y')
         ax.set_zlabel('Z (height)')
 
-        # Equal aspect ratio
-        max_range = np.array([
-            self.positions[:, 0].max() - self.positions[:, 0].min(),
-            self.positions[:, 1].max() - self.positions[:, 1].min(),
-            self.positions[:, 2].max() - self.positions[:, 2].min()
-        ]).max() / 2.0
-
-        mid_x = (self.positions[:, 0].max() + self.positions[:, 0].min()) * 0.5
-        mid_y = (self.positions[:, 1].max() + self.positions[:, 1].min()) * 0.5
-        mid_z = (self.positions[:, 2].max() + self.positions[:, 2].min()) * 0.5
-
-        ax.set_xlim(mid_x - max_range, mid_x + max_range)
-        ax.set_ylim(mid_y - max_range, mid_y + max_range)
-        ax.set_zlim(mid_z - max_range, mid_z + max_range)
+        # Equal aspect ratio from the cached extents
+        ax.set_xlim(self._mid[0] - self._max_range, self._mid[0] + self._max_range)
+        ax.set_ylim(self._mid[1] - self._max_range, self._mid[1] + self._max_range)
+        ax.set_zlim(self._mid[2] - self._max_range, self._mid[2] + self._max_range)
 
         if not show_axes:
             ax.set_axis_off()
 
-        # Title with frame info
+        # Title with frame info; animated=True so blitting treats it as
+        # a per-frame artist rather than static background
         title = ax.text2D(0.5, 0.95, '', transform=ax.transAxes,
-                         ha='center', va='top', fontsize=12, weight='bold')
+                         ha='center', va='top', fontsize=12, weight='bold',
+                         animated=True)
 
         # Animation info text
         info_text = ax.text2D(0.02, 0.98, '', transform=ax.transAxes,
-                             ha='left', va='top', fontsize=9, family='monospace')
+                             ha='left', va='top', fontsize=9, family='monospace',
+                             animated=True)
 
         def update_title():
             """Update title with current frame info."""
             name = self.metadata.get('name', self.gift_path.stem)
-            frame_info = f"Frame {self.current_frame + 1}/{len(self.frames)}"
+            frame_info = f"Frame {self.current_frame + 1}/{self.frame_count}"
 
             framerate = float(self.metadata.get('framerate', 30))
             time_pos = self.current_frame / framerate
-            duration = len(self.frames) / framerate
+            duration = self.frame_count / framerate
             time_info = f"{time_pos:.2f}s / {duration:.2f}s"
 
             status = "▶ PLAYING" if self.playing else "⏸ PAUSED"
@@ -332,77 +453,90 @@ class GIFTSimulator:
         def update_frame(frame_num):
             """Update visualization for current frame."""
             if self.playing:
-                self.current_frame = (self.current_frame + 1) % len(self.frames)
+                self.current_frame = (self.current_frame + 1) % self.frame_count
                 if not self.loop and self.current_frame == 0:
                     self.playing = False
 
+            # Paused with nothing new to show: skip the color upload
+            # and text relayout entirely
+            if not self.playing and self.current_frame == self._last_drawn_frame:
+                return scatter, title, info_text
+
             colors = self.get_frame_colors(self.current_frame)
-            scatter.set_color(colors)
+            scatter.set_facecolors(colors)
             update_title()
-            return scatter,
+            self._last_drawn_frame = self.current_frame
+            return scatter, title, info_text
+
+        # Base animation interval; the live interval is this divided by
+        # the current speed, retuned whenever the speed changes
+        framerate = float(self.metadata.get('framerate', 30))
+        base_interval = 1000.0 / framerate  # milliseconds per frame
 
         # Keyboard controls
+        def step_to(frame):
+            """Jump to a frame; repaint immediately only when paused
+            (the next animation tick repaints anyway while playing)."""
+            self.current_frame = frame % self.frame_count
+            if not self.playing:
+                scatter.set_facecolors(self.get_frame_colors(self.current_frame))
+                self._last_drawn_frame = self.current_frame
+            update_title()
+
+        def toggle_play():
+            self.playing = not self.playing
+            update_title()
+
+        def toggle_loop():
+            self.loop = not self.loop
+            update_title()
+
+        def apply_speed():
+            """Push the current speed into the running timer; without
+            this the interval computed at startup would stick forever."""
+            if self._anim is not None:
+                self._anim.event_source.interval = base_interval / self.speed
+            update_title()
+
+        def speed_up():
+            self.speed = min(self.speed * 1.5, 10.0)
+            apply_speed()
+
+        def slow_down():
+            self.speed = max(self.speed / 1.5, 0.1)
+            apply_speed()
+
+        handlers = {
+            ' ': toggle_play,
+            'right': lambda: step_to(self.current_frame + 1),
+            'left': lambda: step_to(self.current_frame - 1),
+            'l': toggle_loop,
+            'r': lambda: step_to(0),
+            '+': speed_up,
+            '=': speed_up,
+            '-': slow_down,
+            '_': slow_down,
+        }
+
         def on_key(event):
-            """Handle keyboard events."""
-            if event.key == ' ':
-                # Toggle play/pause
-                self.playing = not self.playing
-                update_title()
-                fig.canvas.draw_idle()
-            elif event.key == 'right':
-                # Next frame
-                self.current_frame = (self.current_frame + 1) % len(self.frames)
-                colors = self.get_frame_colors(self.current_frame)
-                scatter.set_color(colors)
-                update_title()
-                fig.canvas.draw_idle()
-            elif event.key == 'left':
-                # Previous frame
-                self.current_frame = (self.current_frame - 1) % len(self.frames)
-                colors = self.get_frame_colors(self.current_frame)
-                scatter.set_color(colors)
-                update_title()
-                fig.canvas.draw_idle()
-            elif event.key == 'l':
-                # Toggle loop
-                self.loop = not self.loop
-                update_title()
-                fig.canvas.draw_idle()
-            elif event.key == 'r':
-                # Reset to frame 0
-                self.current_frame = 0
-                colors = self.get_frame_colors(self.current_frame)
-                scatter.set_color(colors)
-                update_title()
-                fig.canvas.draw_idle()
-            elif event.key == '+' or event.key == '=':
-                # Increase speed
-                self.speed = min(self.speed * 1.5, 10.0)
-                update_title()
-                fig.canvas.draw_idle()
-            elif event.key == '-' or event.key == '_':
-                # Decrease speed
-                self.speed = max(self.speed / 1.5, 0.1)
-                update_title()
+            """Dispatch keyboard events; redraw only when state changed."""
+            handler = handlers.get(event.key)
+            if handler is not None:
+                handler()
                 fig.canvas.draw_idle()
 
         fig.canvas.mpl_connect('key_press_event', on_key)
 
-        # Calculate animation interval based on framerate and speed
-        framerate = float(self.metadata.get('framerate', 30))
-        base_interval = 1000.0 / framerate  # milliseconds per frame
-
-        def get_interval():
-            """Get current animation interval adjusted for speed."""
-            return base_interval / self.speed
-
         # Create animation
-        anim = FuncAnimation(
+        # Blitting re-draws only the returned artists instead of the
+        # whole 3D axes (ticks, panes, strip path) every frame. Kept on
+        # self so the speed handlers can retune the timer interval.
+        self._anim = FuncAnimation(
             fig,
             update_frame,
-            frames=len(self.frames),
-            interval=get_interval(),
-            blit=False,
+            frames=self.frame_count,
+            interval=base_interval / self.speed,
+            blit=True,
             repeat=True
         )
 
@@ -421,12 +555,20 @@ class GIFTSimulator:
             view_angles: List of (elevation, azimuth) tuples for different views
         """
         output_path = Path(output_dir)
+
+        # A .mp4 target streams frames straight to ffmpeg instead of
+        # writing per-frame PNGs
+        if output_path.suffix.lower() == '.mp4':
+            view = view_angles[0] if view_angles else (30, 45)
+            self.export_video(output_path, frame_indices, view_angle=view)
+            return
+
         output_path.mkdir(parents=True, exist_ok=True)
 
         if frame_indices is None:
             # Export every 30th frame by default
-            step = max(1, len(self.frames) // 10)
-            frame_indices = list(range(0, len(self.frames), step))
+            step = max(1, self.frame_count // 10)
+            frame_indices = list(range(0, self.frame_count, step))
 
         if view_angles is None:
             view_angles = [(30, 45)]  # Single default view
@@ -435,52 +577,114 @@ class GIFTSimulator:
         print(f"  Frames: {len(frame_indices)}")
         print(f"  Views: {len(view_angles)}")
 
+        # Each PNG render is independent and CPU-bound in Agg, so fan
+        # the (frame, view) grid out across cores when there is enough
+        # work to cover the process spin-up
+        tasks = []
+        for frame_idx in frame_indices:
+            for view_idx, (elev, azim) in enumerate(view_angles):
+                view_suffix = f"_view{view_idx}" if len(view_angles) > 1 else ""
+                output_file = output_path / f"frame_{frame_idx:04d}{view_suffix}.png"
+                tasks.append((frame_idx, elev, azim, str(output_file)))
+
+        max_workers = min(os.cpu_count() or 1, len(tasks))
+        if max_workers > 1 and len(tasks) > 2:
+            with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=_preview_worker_init,
+                    initargs=(self,)) as executor:
+                for name in executor.map(_render_preview_frame, tasks):
+                    print(f"  Saved: {name}")
+            return
+
+        # Build the figure and artists once; per frame/view only the
+        # colors, camera and title change
+        fig, ax, scatter = self._make_preview_figure(
+            self.get_frame_colors(frame_indices[0]) if frame_indices else 'black')
+
         for frame_idx in frame_indices:
             colors = self.get_frame_colors(frame_idx)
 
             for view_idx, (elev, azim) in enumerate(view_angles):
-                fig = plt.figure(figsize=(10, 8))
-                ax = fig.add_subplot(111, projection='3d')
-
-                ax.scatter(
-                    self.positions[:, 0],
-                    self.positions[:, 1],
-                    self.positions[:, 2],
-                    c=colors,
-                    s=100,
-                    alpha=0.9,
-                    edgecolors='black',
-                    linewidths=0.5
-                )
-
+                scatter.set_facecolors(colors)
                 ax.view_init(elev=elev, azim=azim)
-                ax.set_xlabel('X')
-                ax.set_ylabel('Y')
-                ax.set_zlabel('Z (height)')
                 ax.set_title(f"{self.gift_path.stem} - Frame {frame_idx}")
 
-                # Equal aspect ratio
-                max_range = np.array([
-                    self.positions[:, 0].max() - self.positions[:, 0].min(),
-                    self.positions[:, 1].max() - self.positions[:, 1].min(),
-                    self.positions[:, 2].max() - self.positions[:, 2].min()
-                ]).max() / 2.0
-
-                mid_x = (self.positions[:, 0].max() + self.positions[:, 0].min()) * 0.5
-                mid_y = (self.positions[:, 1].max() + self.positions[:, 1].min()) * 0.5
-                mid_z = (self.positions[:, 2].max() + self.positions[:, 2].min()) * 0.5
-
-                ax.set_xlim(mid_x - max_range, mid_x + max_range)
-                ax.set_ylim(mid_y - max_range, mid_y + max_range)
-                ax.set_zlim(mid_z - max_range, mid_z + max_range)
-
                 view_suffix = f"_view{view_idx}" if len(view_angles) > 1 else ""
                 output_file = output_path / f"frame_{frame_idx:04d}{view_suffix}.png"
-                plt.savefig(output_file, dpi=150, bbox_inches='tight')
-                plt.close()
+                fig.savefig(output_file, dpi=150, bbox_inches='tight')
 
                 print(f"  Saved: {output_file.name}")
 
+        plt.close(fig)
+
+    def _make_preview_figure(self, initial_colors):
+        """Build the shared figure/axes/scatter used by the export paths."""
+        fig = plt.figure(figsize=(10, 8))
+        ax = fig.add_subplot(111, projection='3d')
+
+        scatter = ax.scatter(
+            self.positions[:, 0],
+            self.positions[:, 1],
+            self.positions[:, 2],
+            c=initial_colors,
+            s=100,
+            alpha=0.9,
+            edgecolors='black' if self.led_count <= 200 else 'none',
+            linewidths=0.5
+        )
+
+        ax.set_xlabel('X')
+        ax.set_ylabel('Y')
+        ax.set_zlabel('Z (height)')
+
+        # Equal aspect ratio from the cached extents
+        ax.set_xlim(self._mid[0] - self._max_range, self._mid[0] + self._max_range)
+        ax.set_ylim(self._mid[1] - self._max_range, self._mid[1] + self._max_range)
+        ax.set_zlim(self._mid[2] - self._max_range, self._mid[2] + self._max_range)
+
+        return fig, ax, scatter
+
+    def export_video(self, output_file, frame_indices: Optional[List[int]] = None,
+                     view_angle: Tuple[float, float] = (30, 45)):
+        """
+        Render the animation to a video file via ffmpeg.
+
+        Frames stream straight to the encoder — no intermediate PNGs
+        on disk.
+
+        Args:
+            output_file: Output video path (.mp4)
+            frame_indices: Frames to render (default: all)
+            view_angle: (elevation, azimuth) camera angle
+        """
+        if not FFMpegWriter.isAvailable():
+            print("Error: ffmpeg not found — video export requires ffmpeg on PATH")
+            return
+
+        if frame_indices is None:
+            frame_indices = range(self.frame_count)
+
+        framerate = float(self.metadata.get('framerate', 30))
+
+        print(f"\nExporting video to: {output_file}")
+        print(f"  Frames: {len(frame_indices)}")
+        print(f"  Framerate: {framerate} fps")
+
+        fig, ax, scatter = self._make_preview_figure(
+            self.get_frame_colors(frame_indices[0]) if len(frame_indices) else 'black')
+        ax.view_init(elev=view_angle[0], azim=view_angle[1])
+        ax.set_title(self.gift_path.stem)
+
+        writer = FFMpegWriter(fps=framerate, codec='libx264')
+        with writer.saving(fig, str(output_file), dpi=150):
+            for frame_idx in frame_indices:
+                scatter.set_facecolors(self.get_frame_colors(frame_idx))
+                writer.grab_frame()
+
+        plt.close(fig)
+        print(f"✓ Exported {len(frame_indices)} frames to {output_file}")
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -516,7 +720,9 @@ Interactive Controls:
     parser.add_argument('position_map',
                        help='Position map JSON file')
     parser.add_argument('--export-frames', type=str,
-                       help='Export preview frames to directory (instead of interactive visualization)')
+                       help='Export preview frames to directory, or render a '
+                            'video if the path ends in .mp4 (instead of '
+                            'interactive visualization)')
     parser.add_argument('--marker-size', type=int, default=100,
                        help='LED marker size (default: 100)')
     parser.add_argument('--view', type=float, nargs=2, default=[30, 45],
@@ -524,6 +730,8 @@ Interactive Controls:
                        help='Initial view angle: elevation azimuth (default: 30 45)')
     parser.add_argument('--no-axes', action='store_true',
                        help='Hide coordinate axes')
+    parser.add_argument('--show-strip', action='store_true',
+                       help='Draw the gray LED strip path line')
 
     args = parser.parse_args()
 
@@ -562,7 +770,8 @@ Interactive Controls:
         simulator.visualize(
             view_angle=tuple(args.view),
             marker_size=args.marker_size,
-            show_axes=not args.no_axes
+            show_axes=not args.no_axes,
+            show_strip=args.show_strip
         )
 
 